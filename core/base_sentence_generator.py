@@ -96,6 +96,7 @@ class BaseSentenceGenerator(ABC):
         """
         new_data = row_data.copy()
 
+        # 逐行逐参数调用，日志参数交给 logging 延迟格式化，DEBUG 关闭时不拼字符串
         for name, value in row_data.items():
             if not value:
                 continue
@@ -107,7 +108,7 @@ class BaseSentenceGenerator(ABC):
                 # 单一翻译类型
                 new_value = self.translator.translate(translate_type, value)
                 new_data[name] = new_value
-                logger.debug(f"翻译参数 {name}: {value} -> {new_value}")
+                logger.debug("翻译参数 %s: %s -> %s", name, value, new_value)
 
             elif param_cfg.get("translate_types", []):
                 # 多个可能的翻译类型
@@ -115,7 +116,7 @@ class BaseSentenceGenerator(ABC):
                     if self.translator.has_mapping(trans_type, value):
                         new_value = self.translator.translate(trans_type, value)
                         new_data[name] = new_value
-                        logger.debug(f"翻译参数 {name}: {value} -> {new_value}")
+                        logger.debug("翻译参数 %s: %s -> %s", name, value, new_value)
                         break
 
         return new_data
@@ -2,6 +2,7 @@
 引擎处理器模块
 基于管道模式的协调器，负责协调数据在生成器管道中的流动
 """
+from collections.abc import Mapping
 from typing import List, Dict, Any
 import pandas as pd
 from core.sentence_generator_manager import SentenceGeneratorManager
@@ -72,7 +73,7 @@ class EngineProcessor:
             generator_params = getattr(generator, "param_config", {}) or {}
             generator_params_keys = (
                 generator_params.keys()
-                if isinstance(generator_params, dict)
+                if isinstance(generator_params, Mapping)
                 else generator_params
             )
 
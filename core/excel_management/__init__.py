@@ -10,6 +10,8 @@ from .excel_file_manager import ExcelFileManager
 from .dataframe_processor import DataFrameProcessor
 from .excel_editor import ExcelEditor
 from .excel_decorators import handle_excel_operation
+from .file_state import read_file_state, write_file_state
+from .sheet_cache import load_sheets_cached
 
 __all__ = [
     # 异常
@@ -30,6 +32,13 @@ __all__ = [
     
     # 装饰器
     'handle_excel_operation',
+
+    # 处理记录
+    'read_file_state',
+    'write_file_state',
+
+    # 解析缓存
+    'load_sheets_cached',
     
     # 工厂函数
     'create_excel_manager',
@@ -131,10 +131,10 @@ class DataFrameProcessor:
                 logger.debug(f"标记列不存在: {marker_column}")
                 return -1
             
-            # 查找包含标记值的行
-            matches = df[df[marker_column] == marker_value]
-            if not matches.empty:
-                position = matches.index[0]
+            # 在列的 numpy 数组上比较，argmax 直接给出第一个匹配的位置，不再筛出匹配行的子表
+            mask = df[marker_column].to_numpy() == marker_value
+            if mask.any():
+                position = int(mask.argmax())
                 logger.debug(f"找到标记 '{marker_value}' 在位置 {position}")
                 return position
                 
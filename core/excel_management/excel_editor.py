@@ -1,4 +1,5 @@
 import pandas as pd
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List
 
@@ -13,6 +14,9 @@ from .excel_exceptions import ExcelWriteError
 
 logger = get_logger(__name__)
 
+# 参数表单元格统一使用的居中对齐样式
+CENTER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+
 
 # ==================== Excel编辑器（高级功能） ====================
 class ExcelEditor:
@@ -125,24 +129,23 @@ class ExcelEditor:
             # 获取或创建工作表
             if sheet_name in wb.sheetnames:
                 ws = wb[sheet_name]
+                if self._parameter_sheet_matches(wb, ws, parameter_data, create_named_ranges):
+                    logger.info(f"参数表无需更新: {file_path}")
+                    return True
                 # 清空现有数据（保留格式和命名区域）
                 ws.delete_rows(1, ws.max_row)
             else:
                 ws = wb.create_sheet(sheet_name)
             
-            # 创建居中对齐样式
-            center_alignment = Alignment(horizontal='center', vertical='center')
-            
             # 写入参数数据
             for col_idx, (param_type, param_values) in enumerate(parameter_data.items(), 1):
                 # 写入表头
-                cell = ws.cell(row=1, column=col_idx, value=param_type)
-                cell.alignment = center_alignment
+                header = ws.cell(row=1, column=col_idx, value=param_type)
+                header.alignment = CENTER_ALIGNMENT
                 
                 # 写入参数值
                 for row_idx, value in enumerate(param_values, 2):
-                    cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                    cell.alignment = center_alignment
+                    ws.cell(row=row_idx, column=col_idx, value=value).alignment = CENTER_ALIGNMENT
                 
                 # 创建命名区域
                 if create_named_ranges and param_values:
@@ -157,6 +160,71 @@ class ExcelEditor:
             logger.error(f"更新参数表失败: {file_path}", exc_info=True)
             raise ExcelWriteError(f"更新参数表失败: {file_path}", e)
     
+    def _parameter_sheet_matches(
+        self,
+        wb: Workbook,
+        ws,
+        parameter_data: Dict[str, List[str]],
+        create_named_ranges: bool
+    ) -> bool:
+        """
+        判断参数表内容（及命名区域）是否已经与要写入的数据一致
+
+        逐列与期望值同步比较，遇到第一个不一致就返回。
+
+        Args:
+            wb: 工作簿对象
+            ws: 参数表工作表
+            parameter_data: 参数数据 {参数类型: [参数值列表]}
+            create_named_ranges: 是否需要检查命名区域
+
+        Returns:
+            bool: 一致时返回 True，可以跳过重写和保存
+        """
+        if not parameter_data:
+            return False
+
+        expected_rows = 1 + max(len(values) for values in parameter_data.values())
+        if ws.max_column != len(parameter_data) or ws.max_row != expected_rows:
+            return False
+
+        for column, (param_type, values) in zip(ws.iter_cols(values_only=True), parameter_data.items()):
+            if column[0] != param_type:
+                return False
+            for row_idx, value in enumerate(values, 1):
+                if column[row_idx] != value:
+                    return False
+            if any(cell is not None for cell in column[len(values) + 1:]):
+                return False
+
+        if create_named_ranges:
+            for col_idx, (param_type, values) in enumerate(parameter_data.items(), 1):
+                if not values:
+                    continue
+                defined_name = wb.defined_names.get(f"{param_type}List")
+                if defined_name is None or defined_name.attr_text != self._named_range_formula(ws.title, col_idx):
+                    return False
+
+        return True
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _named_range_formula(sheet_name: str, col_idx: int) -> str:
+        """
+        参数列的动态范围公式
+
+        每个演出表格的参数表列数相同，公式按 (工作表, 列) 缓存，处理多个文件时只构建一次。
+
+        Args:
+            sheet_name: 工作表名称
+            col_idx: 列索引
+
+        Returns:
+            str: 从第 2 行开始、随列内容长度变化的 OFFSET 公式
+        """
+        col_letter = get_column_letter(col_idx)
+        return f"OFFSET({sheet_name}!${col_letter}$2,0,0,COUNTA({sheet_name}!${col_letter}:${col_letter})-1,1)"
+
     def _create_named_range(
         self,
         wb: Workbook,
@@ -174,24 +242,22 @@ class ExcelEditor:
             col_idx: 列索引
         """
         try:
-            from openpyxl.utils import get_column_letter
             from openpyxl.workbook.defined_name import DefinedName
             
             range_name = f"{param_type}List"
-            col_letter = get_column_letter(col_idx)
             
             # 动态范围公式
-            dynamic_range = f"OFFSET({sheet_name}!${col_letter}$2,0,0,COUNTA({sheet_name}!${col_letter}:${col_letter})-1,1)"
+            dynamic_range = self._named_range_formula(sheet_name, col_idx)
             
-            # 删除已存在的同名区域
-            if range_name in wb.defined_names:
-                del wb.defined_names[range_name]
-            
-            # 创建新的命名区域
-            wb.defined_names[range_name] = DefinedName(
-                name=range_name,
-                attr_text=dynamic_range
-            )
+            # 已存在的同名区域直接改公式，否则新建
+            existing = wb.defined_names.get(range_name)
+            if existing is not None:
+                existing.attr_text = dynamic_range
+            else:
+                wb.defined_names[range_name] = DefinedName(
+                    name=range_name,
+                    attr_text=dynamic_range
+                )
             logger.debug(f"创建命名区域: {range_name} = {dynamic_range}")
             
         except Exception as e:
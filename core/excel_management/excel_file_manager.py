@@ -1,6 +1,6 @@
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Literal
+from typing import Dict, List, Literal, Optional
 
 from core.logger import get_logger
 from core.constants import SheetName, ColumnName, Marker
@@ -23,15 +23,18 @@ class ExcelFileManager:
     负责Excel文件的读取、缓存和工作表管理
     """
     
-    def __init__(self, cache_enabled: bool = True):
+    def __init__(self, cache_enabled: bool = True, read_engine: Optional[str] = None):
         """
         初始化Excel文件管理器
         
         Args:
             cache_enabled: 是否启用文件缓存
+            read_engine: pd.read_excel 使用的引擎，None 表示 pandas 默认引擎；
+                安装了 python-calamine 且 pandas>=2.2 时可传入 "calamine" 加快读取
         """
         self._file_cache: Dict[Path, Dict[str, pd.DataFrame]] = {}
         self.cache_enabled = cache_enabled
+        self.read_engine = read_engine
 
     @handle_excel_operation
     def load_excel(self, file_path: Path) -> Dict[str, pd.DataFrame]:
@@ -60,12 +63,8 @@ class ExcelFileManager:
         
         logger.info(f"加载Excel文件: {file_path}")
         try:
-            # 读取所有工作表，所有列作为字符串类型处理
-            data = pd.read_excel(file_path, sheet_name=None, dtype=str)
-            
-            # 清理数据：将NaN转换为空字符串
-            for sheet_name, df in data.items():
-                data[sheet_name] = df.fillna("")
+            # 读取所有工作表，所有列作为字符串类型处理，空单元格直接读成空字符串
+            data = self._read_all_sheets(file_path)
             
             if self.cache_enabled:
                 self._file_cache[file_path] = data
@@ -80,6 +79,21 @@ class ExcelFileManager:
             logger.error(f"读取Excel文件失败: {file_path}", exc_info=True)
             raise ExcelManagerError(f"读取Excel文件失败: {file_path}", e)
     
+    def _read_all_sheets(self, file_path: Path) -> Dict[str, pd.DataFrame]:
+        """
+        读取所有工作表，所有列作为字符串类型
+
+        关闭 NA 识别（na_filter=False）：空单元格读成 ""，"None"、"NA" 等文本按原样保留，
+        也省去了逐单元格的缺失值判断和事后 fillna。
+
+        Args:
+            file_path: Excel文件路径
+
+        Returns:
+            Dict[str, pd.DataFrame]: 工作表名到DataFrame的映射（保持工作表顺序）
+        """
+        return pd.read_excel(file_path, sheet_name=None, dtype=str, na_filter=False, engine=self.read_engine)
+
     def get_sheet(self, file_path: Path, sheet_name: str) -> pd.DataFrame:
         """
         获取指定工作表的DataFrame
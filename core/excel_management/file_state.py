@@ -0,0 +1,47 @@
+"""
+文件处理记录模块
+以 JSON 保存“文件绝对路径 -> 上次处理时的指纹”，供脚本跳过未变化的文件
+"""
+import json
+from pathlib import Path
+from typing import Dict
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def read_file_state(state_file: Path) -> Dict[str, Dict]:
+    """
+    读取处理记录
+
+    Args:
+        state_file: 记录文件路径
+
+    Returns:
+        Dict[str, Dict]: 文件绝对路径 -> 上次处理时的指纹；记录不存在或损坏时返回空字典
+    """
+    if not state_file.exists():
+        return {}
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"处理记录损坏，忽略: {state_file} - {e}")
+        return {}
+
+
+def write_file_state(state_file: Path, file_state: Dict[str, Dict]):
+    """
+    保存处理记录，写入失败只记录警告
+
+    Args:
+        state_file: 记录文件路径
+        file_state: 文件绝对路径 -> 本次处理后的指纹
+    """
+    try:
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_file, "w", encoding="utf-8") as f:
+            json.dump(file_state, f, ensure_ascii=False)
+    except OSError as e:
+        logger.warning(f"写入处理记录失败: {state_file} - {e}")
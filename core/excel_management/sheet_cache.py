@@ -0,0 +1,73 @@
+"""
+工作表解析缓存模块
+把 Excel 解析结果以 pickle 保存到磁盘，文件未变化时跳过重新解析
+"""
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from core.logger import get_logger
+from .excel_file_manager import ExcelFileManager
+
+logger = get_logger(__name__)
+
+# 缓存格式版本，读取逻辑变化时递增，使旧缓存失效
+SHEET_CACHE_VERSION = 1
+
+
+def load_sheets_cached(
+    excel_file: Path,
+    excel_manager: ExcelFileManager,
+    cache_dir: Optional[Path] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    读取 Excel 文件的所有工作表，文件未变化时从磁盘缓存加载
+
+    缓存位于 <cache_dir>/<路径哈希>.pkl，每个文件只保留一份，内容变化时原地替换：
+    先存 (版本, 读取引擎, 修改时间, 大小)，再存工作表数据，不匹配时不必反序列化工作表。
+
+    Args:
+        excel_file: Excel 文件路径
+        excel_manager: Excel 文件管理器
+        cache_dir: 缓存目录，None 表示不使用磁盘缓存
+
+    Returns:
+        Dict[str, pd.DataFrame]: 工作表名到 DataFrame 的映射
+    """
+    if cache_dir is None or not excel_file.exists():
+        return excel_manager.load_excel(excel_file)
+
+    stat = excel_file.stat()
+    file_key = (SHEET_CACHE_VERSION, excel_manager.read_engine, stat.st_mtime_ns, stat.st_size)
+    path_digest = hashlib.blake2b(str(excel_file.resolve()).encode("utf-8"), digest_size=16).hexdigest()
+    cache_file = cache_dir / f"{path_digest}.pkl"
+
+    if cache_file.exists():
+        try:
+            with open(cache_file, "rb") as f:
+                if pickle.load(f) == file_key:
+                    sheets = pickle.load(f)
+                    logger.debug(f"从解析缓存加载: {excel_file}")
+                    return sheets
+        except Exception as e:
+            logger.warning(f"解析缓存损坏，重新读取: {cache_file} - {e}")
+
+    sheets = excel_manager.load_excel(excel_file)
+
+    # 先写临时文件再替换，中断时不会留下写了一半的缓存
+    tmp_file = cache_file.with_name(cache_file.name + ".tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, "wb") as f:
+            pickle.dump(file_key, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(sheets, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        tmp_file.unlink(missing_ok=True)
+        logger.warning(f"写入解析缓存失败: {cache_file} - {e}")
+
+    return sheets
@@ -2,8 +2,10 @@
 参数翻译器模块
 负责将用户友好的参数名称翻译为引擎特定的语法
 """
+import ast
 import importlib.util
 import os
+from functools import lru_cache
 from typing import Dict, Optional, List, Any
 from pathlib import Path
 from core.logger import get_logger
@@ -13,6 +15,100 @@ from core.exceptions import TranslationError
 logger = get_logger()
 
 
+def _parse_literal_assignments(source: bytes) -> Optional[Dict[str, Any]]:
+    """
+    解析只包含 `NAME = 字面量` 赋值的纯数据模块
+
+    自动生成的映射文件都是这种形式，可以用 ast.literal_eval 直接取值，
+    不需要编译和执行模块。
+
+    Args:
+        source: 模块源码
+
+    Returns:
+        Optional[Dict[str, Any]]: 变量名到值的字典；模块包含其他语句时返回 None
+    """
+    namespace = {}
+    for node in ast.parse(source).body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+        ):
+            try:
+                namespace[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                return None
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            # 模块文档字符串
+            continue
+        else:
+            return None
+    return namespace
+
+
+@lru_cache(maxsize=32)
+def _load_mapping_namespace(
+    module_file: str,
+    module_name: str,
+    mtime_ns: int,
+    size: int
+) -> Dict[str, Any]:
+    """
+    加载映射模块并返回其命名空间
+
+    以 (路径, 修改时间, 文件大小) 作为缓存键，同一个未修改的文件只读取一次；
+    文件被重新生成后键随之变化，会自动重新加载。纯数据模块走字面量解析，
+    其余模块才回退到执行模块。返回的命名空间由所有调用方共享，不应修改。
+
+    Args:
+        module_file: 映射模块文件路径
+        module_name: 模块名
+        mtime_ns: 文件修改时间（纳秒），仅用作缓存键
+        size: 文件大小，仅用作缓存键
+
+    Returns:
+        Dict[str, Any]: 模块命名空间
+    """
+    source = Path(module_file).read_bytes()
+    namespace = _parse_literal_assignments(source)
+    if namespace is None:
+        spec = importlib.util.spec_from_file_location(module_name, module_file)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        namespace = vars(module)
+
+    return namespace
+
+
+def _load_mapping_file(module_file: str, module_name: str) -> Dict[str, Any]:
+    """
+    加载映射模块命名空间（带缓存）
+
+    Args:
+        module_file: 映射模块文件路径
+        module_name: 模块名
+
+    Returns:
+        Dict[str, Any]: 模块命名空间
+    """
+    stat = os.stat(module_file)
+    return _load_mapping_namespace(module_file, module_name, stat.st_mtime_ns, stat.st_size)
+
+
+def _copy_mappings(mappings: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """
+    复制两层映射字典，使每个翻译器实例持有自己的映射，不会改动缓存中的命名空间
+
+    Args:
+        mappings: 缓存中的映射字典
+
+    Returns:
+        Dict[str, Dict[str, str]]: 映射字典的副本
+    """
+    return {param_type: dict(values) for param_type, values in mappings.items()}
+
+
 class ParamTranslator:
     """
     参数翻译器类，用于加载参数映射并提供翻译功能
@@ -60,13 +156,8 @@ class ParamTranslator:
             return {}
 
         try:
-            spec = importlib.util.spec_from_file_location(
-                "param_mappings",
-                self.module_file
-            )
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            mappings = module.PARAM_MAPPINGS
+            namespace = _load_mapping_file(self.module_file, "param_mappings")
+            mappings = _copy_mappings(namespace["PARAM_MAPPINGS"])
             logger.debug(f"成功加载基础参数映射: {len(mappings)} 个类型")
             return mappings
         except Exception as e:
@@ -85,13 +176,8 @@ class ParamTranslator:
             return {}
 
         try:
-            spec = importlib.util.spec_from_file_location(
-                "varient_mappings",
-                self.varient_module_file
-            )
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            varient_mappings = getattr(module, "VARIENT_MAPPINGS", {})
+            namespace = _load_mapping_file(self.varient_module_file, "varient_mappings")
+            varient_mappings = _copy_mappings(namespace.get("VARIENT_MAPPINGS", {}))
             logger.debug(f"成功加载差分参数映射: {len(varient_mappings)} 个角色")
             return varient_mappings
         except Exception as e:
@@ -2,7 +2,7 @@
 资源提取器模块
 从 Excel 数据中提取资源引用
 """
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple
 from collections import defaultdict
 from core.sentence_generator_manager import SentenceGeneratorManager
 from core.param_translator import ParamTranslator
@@ -35,6 +35,11 @@ class ResourceExtractor:
         self.translator = translator
         self.engine_config = engine_config
         self.generators = []
+        # 所有生成器的资源配置（按生成器顺序展平）和 资源类型 -> 资源类别，setup 时计算一次
+        self._resource_configs: List[Dict] = []
+        self._category_by_type: Dict[str, str] = {}
+        # 翻译结果缓存：(参数类型, 原值) -> 翻译后的值，同一资源名在各行中反复出现
+        self._translation_cache: Dict[Tuple[str, str], str] = {}
 
     def setup(self):
         """设置提取器，创建生成器实例"""
@@ -42,8 +47,23 @@ class ResourceExtractor:
             self.translator,
             self.engine_config
         )
+        self._resource_configs = [
+            config
+            for generator in self.generators
+            for config in self.get_resource_configs(generator)
+        ]
+        self._category_by_type = {}
+        for config in self._resource_configs:
+            # 与逐个生成器查找时一致：同一资源类型以第一个配置为准
+            self._category_by_type.setdefault(config["resource_type"], config.get("resource_category", ""))
+        self._translation_cache.clear()
         logger.info(f"资源提取器设置完成，共 {len(self.generators)} 个生成器")
 
+    @property
+    def resource_configs(self) -> List[Dict]:
+        """所有生成器的资源配置（setup 时展平计算一次）"""
+        return self._resource_configs
+
     def extract_from_row(self, row_data: Dict) -> Dict[str, Set[str]]:
         """
         从一行数据中提取所有资源
@@ -55,17 +75,26 @@ class ResourceExtractor:
             Dict[str, Set[str]]: {资源类型: {资源名集合}}
             例如: {"Character": {"alice happy smile"}, "Music": {"bgm01"}}
         """
-        resources = defaultdict(set)
+        return self._extract_with_configs(row_data, self._resource_configs)
 
-        for generator in self.generators:
-            # 获取所有 resource_config
-            configs = self.get_resource_configs(generator)
+    def _extract_with_configs(self, row_data: Dict, configs: List[Dict]) -> Dict[str, Set[str]]:
+        """
+        按给定的资源配置从一行数据中提取资源
 
-            for config in configs:
-                resource_name = self._build_resource_name(row_data, config)
-                if resource_name:
-                    resource_type = config["resource_type"]
-                    resources[resource_type].add(resource_name)
+        Args:
+            row_data: 行数据字典
+            configs: 资源配置列表
+
+        Returns:
+            Dict[str, Set[str]]: {资源类型: {资源名集合}}
+        """
+        resources = defaultdict(set)
+
+        for config in configs:
+            resource_name = self._build_resource_name(row_data, config)
+            if resource_name:
+                resource_type = config["resource_type"]
+                resources[resource_type].add(resource_name)
 
         return dict(resources)
 
@@ -108,26 +137,15 @@ class ResourceExtractor:
         if not main_value or main_value == "":
             return ""
 
-        # 确保是字符串类型
-        main_value = str(main_value).strip()
-
-        # 翻译主参数
-        if self.translator.has_mapping(config["resource_type"], main_value):
-            main_value = self.translator.translate(config["resource_type"], main_value)
-
-        result = str(main_value)
+        # 确保是字符串类型，并翻译主参数
+        result = self._translate_value(config["resource_type"], str(main_value).strip())
         separator = config.get("separator", " ")
 
         # 拼接差分参数
         for part_param in config.get("part_params", []):
             if part_param in row_data and row_data[part_param]:
-                part_value = str(row_data[part_param]).strip()
-
                 # 尝试翻译差分参数
-                if self.translator.has_mapping(part_param, part_value):
-                    part_value = self.translator.translate(part_param, part_value)
-
-                part_value = str(part_value)
+                part_value = self._translate_value(part_param, str(row_data[part_param]).strip())
 
                 if separator:
                     result += f"{separator}{part_value}"
@@ -136,6 +154,27 @@ class ResourceExtractor:
 
         return result
 
+    def _translate_value(self, param_type: str, value: str) -> str:
+        """
+        翻译参数值（带缓存），没有映射时返回原值
+
+        Args:
+            param_type: 参数类型
+            value: 原始值
+
+        Returns:
+            str: 翻译后的值
+        """
+        key = (param_type, value)
+        translated = self._translation_cache.get(key)
+        if translated is None:
+            if self.translator.has_mapping(param_type, value):
+                translated = str(self.translator.translate(param_type, value))
+            else:
+                translated = value
+            self._translation_cache[key] = translated
+        return translated
+
     def extract_from_excel(self, excel_data: Dict, config=None) -> Dict[str, Dict[str, Set[str]]]:
         """
         从整个 Excel 文件中提取资源
@@ -165,12 +204,16 @@ class ResourceExtractor:
             if valid_df.empty:
                 continue
 
-            # 遍历有效行
-            for _, row in valid_df.iterrows():
-                row_dict = row.to_dict()
-                
+            # 每个工作表只确定一次哪些资源配置的主参数列存在，行循环中不再逐个配置试探
+            columns = set(valid_df.columns)
+            sheet_configs = [config for config in self._resource_configs if config["main_param"] in columns]
+            if not sheet_configs:
+                continue
+
+            # 遍历有效行（一次性转成字典列表，不为每行构造 Series）
+            for row_dict in valid_df.to_dict("records"):
                 # 提取这一行的资源
-                row_resources = self.extract_from_row(row_dict)
+                row_resources = self._extract_with_configs(row_dict, sheet_configs)
                 
                 # 按资源类别分类
                 for resource_type, resource_names in row_resources.items():
@@ -195,9 +238,4 @@ class ResourceExtractor:
         Returns:
             str: 资源类别（如 "图片", "音频"）
         """
-        for generator in self.generators:
-            configs = self.get_resource_configs(generator)
-            for config in configs:
-                if config["resource_type"] == resource_type:
-                    return config.get("resource_category", "")
-        return ""
+        return self._category_by_type.get(resource_type, "")
@@ -2,7 +2,9 @@
 资源验证器模块
 验证资源文件是否存在于项目库和资源库中
 """
-from typing import Dict, Set, List
+import os
+import unicodedata
+from typing import Dict, Set, List, Optional, Tuple
 from pathlib import Path
 from collections import defaultdict
 from core.logger import get_logger
@@ -10,6 +12,19 @@ from core.logger import get_logger
 logger = get_logger()
 
 
+def _fold_name(name: str) -> str:
+    """
+    把文件名转成 NFC 规范化后的小写形式，用于在目录列表中模糊匹配
+
+    Args:
+        name: 文件名
+
+    Returns:
+        str: 规范化后的文件名
+    """
+    return unicodedata.normalize("NFC", name).lower()
+
+
 class ResourceValidator:
     """资源验证器 - 验证资源文件是否存在"""
 
@@ -30,6 +45,8 @@ class ResourceValidator:
         self.project_root = Path(project_root)
         self.source_root = Path(source_root)
         self.extensions = extensions
+        # 文件夹列表缓存：文件夹 -> (修改时间, 列表)，同一验证器验证多个 Excel 时复用
+        self._folder_listings: Dict[Path, Tuple[int, Tuple[Set[str], Set[str]]]] = {}
 
     def validate_resources(
         self,
@@ -112,31 +129,73 @@ class ResourceValidator:
                 results[name] = ""
             return results
 
+        # 目录只列一次，之后的查找大多是内存中的集合查询
+        listing = self._list_folder(folder)
         for resource_name in resource_names:
-            found_file = self._find_file(folder, resource_name, extensions)
+            found_file = self._find_file(folder, resource_name, extensions, listing)
             results[resource_name] = found_file
 
         return results
 
+    def _list_folder(self, folder: Path) -> Tuple[Set[str], Set[str]]:
+        """
+        列出文件夹中的条目名
+
+        结果按文件夹缓存；文件夹中增删条目会改变其修改时间，此时重新列出。
+
+        Args:
+            folder: 文件夹路径
+
+        Returns:
+            Tuple[Set[str], Set[str]]: (条目名集合, NFC 规范化后的小写条目名集合)
+        """
+        mtime_ns = folder.stat().st_mtime_ns
+        cached = self._folder_listings.get(folder)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        with os.scandir(folder) as entries:
+            names = {entry.name for entry in entries}
+        listing = (names, {_fold_name(name) for name in names})
+        self._folder_listings[folder] = (mtime_ns, listing)
+        return listing
+
     def _find_file(
         self,
         folder: Path,
         resource_name: str,
-        extensions: List[str]
+        extensions: List[str],
+        listing: Optional[Tuple[Set[str], Set[str]]] = None
     ) -> str:
         """
         在文件夹中查找文件
 
+        给出 listing 时先查目录列表：完全同名直接命中，忽略大小写和 Unicode 规范化形式后
+        仍不匹配的直接跳过，其余情况交给文件系统判断（Windows/macOS 上不区分大小写，
+        macOS 上 NFC 与 NFD 形式的文件名视为同一个，例如 Excel 中的假名与磁盘上的文件名）。
+        资源名带子目录时总是交给文件系统判断。
+
         Args:
             folder: 文件夹路径
             resource_name: 资源名（可能包含空格，如 "alice happy smile"）
             extensions: 文件扩展名列表
+            listing: _list_folder 的结果（可选）
 
         Returns:
             str: 找到的文件名（带扩展名），未找到返回空字符串
         """
+        nested = "/" in resource_name or os.sep in resource_name
+
         for ext in extensions:
-            file_path = folder / f"{resource_name}{ext}"
+            file_name = f"{resource_name}{ext}"
+            if listing is not None and not nested:
+                names, lowered_names = listing
+                if file_name in names:
+                    return file_name
+                if _fold_name(file_name) not in lowered_names:
+                    continue
+
+            file_path = folder / file_name
             if file_path.exists():
                 return file_path.name
 
@@ -161,18 +220,23 @@ class ResourceValidator:
                 "missing_in_both": [...]
             }
         """
-        project_found = [name for name in resource_names if project_results.get(name)]
-        project_missing = [name for name in resource_names if not project_results.get(name)]
-        source_found = [name for name in resource_names if source_results.get(name)]
-        source_missing = [name for name in resource_names if not source_results.get(name)]
-
-        missing_in_project_but_in_source = [
-            name for name in project_missing if name in source_found
-        ]
-
-        missing_in_both = [
-            name for name in project_missing if name in source_missing
-        ]
+        project_found = []
+        project_missing = []
+        source_found = []
+        source_missing = []
+        missing_in_project_but_in_source = []
+        missing_in_both = []
+
+        # 一次遍历完成分类，直接查结果字典，不再对列表做 O(n) 的 in 判断
+        for name in resource_names:
+            in_source = bool(source_results.get(name))
+            (source_found if in_source else source_missing).append(name)
+
+            if project_results.get(name):
+                project_found.append(name)
+            else:
+                project_missing.append(name)
+                (missing_in_project_but_in_source if in_source else missing_in_both).append(name)
 
         return {
             "project_found": project_found,
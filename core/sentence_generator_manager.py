@@ -5,6 +5,7 @@
 import importlib
 import pkgutil
 import inspect
+from collections.abc import Mapping
 from typing import List, Dict, Type
 from core.base_sentence_generator import BaseSentenceGenerator
 from core.param_translator import ParamTranslator
@@ -69,7 +70,7 @@ class SentenceGeneratorManager:
         total_params = 0
         for generator_class in self.generator_classes:
             param_config = getattr(generator_class, 'param_config', {})
-            if param_config and isinstance(param_config, dict):
+            if param_config and isinstance(param_config, Mapping):
                 self.param_configs.update(param_config)
                 total_params += len(param_config)
         logger.info(f"从 {len(self.generator_classes)} 个生成器收集了 {total_params} 个参数配置")
@@ -113,7 +114,7 @@ class SentenceGeneratorManager:
         for generator_class in self.generator_classes:
             param_config = getattr(generator_class, 'param_config', {})
             
-            if param_config and isinstance(param_config, dict):
+            if param_config and isinstance(param_config, Mapping):
                 for param_name, config in param_config.items():
                     if isinstance(config, dict):
                         if "translate_type" in config:
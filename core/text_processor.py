@@ -132,6 +132,8 @@ class ChineseExtractor(TextProcessor):
     提取文本中的所有中文字符
     """
 
+    _PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+
     def process(self, text: str) -> str:
         """
         提取中文字符
@@ -142,8 +144,7 @@ class ChineseExtractor(TextProcessor):
         Returns:
             str: 提取后的中文字符
         """
-        pattern = re.compile(r'[\u4e00-\u9fff]+')
-        matches = pattern.findall(text)
+        matches = self._PATTERN.findall(text)
         return ''.join(matches)
     
 
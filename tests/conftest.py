@@ -11,6 +11,16 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 
+def pytest_configure(config):
+    """注册自定义标记，未安装 pytest-xdist 时也不会产生未知标记警告"""
+    config.addinivalue_line(
+        "markers", "xdist_group(name): 将测试固定到同一个 xdist worker（配合 --dist loadgroup）"
+    )
+    config.addinivalue_line(
+        "markers", "slow: 较慢的测试，开发时可用 -m \"not slow\" 跳过"
+    )
+
+
 @pytest.fixture
 def project_root_path():
     """返回项目根目录路径"""
@@ -0,0 +1,32 @@
+"""
+tests/core 共享的 fixtures
+"""
+import pytest
+
+from core.sentence_generator_manager import SentenceGeneratorManager
+
+
+class _StubTranslator:
+    """翻译器替身，生成器构造时只保存引用，不调用任何方法"""
+
+
+class _StubConfig:
+    """引擎配置替身，生成器构造时只保存引用，不读取任何字段"""
+
+
+@pytest.fixture(scope="session")
+def mock_translator():
+    """创建模拟翻译器（只读，会话共享）"""
+    return _StubTranslator()
+
+
+@pytest.fixture(scope="session")
+def mock_config():
+    """创建模拟配置（只读，会话共享）"""
+    return _StubConfig()
+
+
+@pytest.fixture
+def manager():
+    """创建管理器实例"""
+    return SentenceGeneratorManager("test_engine")
@@ -1,32 +1,67 @@
 """
 测试 engine_processor 模块
 """
+from types import MappingProxyType
+
 import pytest
 import pandas as pd
-from unittest.mock import Mock, patch, MagicMock
+from contextlib import contextmanager
+from unittest.mock import Mock, MagicMock
+import core.engine_processor as engine_processor_module
 from core.engine_processor import EngineProcessor
 from core.base_sentence_generator import BaseSentenceGenerator
 from core.param_translator import ParamTranslator
 from core.config_manager import EngineConfig
 from core.sentence_generator_manager import SentenceGeneratorManager
 
+# 模块级 fixture 只在同一个 xdist worker 上构建一次
+pytestmark = pytest.mark.xdist_group(name="engine_processor")
+
+
+@contextmanager
+def _swap_mgr():
+    """
+    直接替换 engine_processor 模块中的 SentenceGeneratorManager
+
+    Yields:
+        Mock: 处理器构造时得到的模拟管理器实例
+    """
+    mock_manager = Mock(spec_set=SentenceGeneratorManager)
+    original = engine_processor_module.SentenceGeneratorManager
+    engine_processor_module.SentenceGeneratorManager = lambda engine_type: mock_manager
+    try:
+        yield mock_manager
+    finally:
+        engine_processor_module.SentenceGeneratorManager = original
+
+
+# 预先构建的只读行数据，process_row 只读取不修改
+_ROW_MUSIC_BROKEN = pd.Series(["bgm_main", "test"], index=["Music", "Broken"])
+_ROW_TEST = pd.Series(["value"], index=["Test"])
+_ROW_EMPTY = pd.Series([], dtype=object)
+_WORKFLOW_ROWS = (
+    pd.Series(["bg1", "bgm1"], index=["Background", "Music"]),
+    pd.Series(["alice", "Alice", "Hi"], index=["Character", "Speaker", "Text"]),
+    pd.Series(["sfx1"], index=["Sound"]),
+)
+_MUSIC_ROWS = (
+    pd.Series(["bgm1"], index=["Music"]),
+    pd.Series(["bgm2"], index=["Music"]),
+    pd.Series(["sfx1"], index=["Sound"]),
+)
+
 
 # 创建测试用的生成器类
 class MockMusicGenerator(BaseSentenceGenerator):
     """测试音乐生成器"""
 
-    param_config = {
+    param_config = MappingProxyType({
         "Music": {"format": "play music {value}"},
         "Sound": {"format": "play sound {value}"}
-    }
-
-    @property
-    def category(self):
-        return "music"
+    })
 
-    @property
-    def priority(self):
-        return 10
+    category = "music"
+    priority = 10
 
     def process(self, data):
         commands = []
@@ -40,18 +75,13 @@ class MockMusicGenerator(BaseSentenceGenerator):
 class MockSceneGenerator(BaseSentenceGenerator):
     """测试场景生成器"""
 
-    param_config = {
+    param_config = MappingProxyType({
         "Background": {"format": "scene {value}"},
         "Character": {"format": "show {value}"}
-    }
+    })
 
-    @property
-    def category(self):
-        return "scene"
-
-    @property
-    def priority(self):
-        return 5
+    category = "scene"
+    priority = 5
 
     def process(self, data):
         commands = []
@@ -65,18 +95,13 @@ class MockSceneGenerator(BaseSentenceGenerator):
 class MockDialogueGenerator(BaseSentenceGenerator):
     """测试对话生成器"""
 
-    param_config = {
+    param_config = MappingProxyType({
         "Speaker": {"format": "{value}"},
         "Text": {"format": "\"{value}\""}
-    }
-
-    @property
-    def category(self):
-        return "dialogue"
+    })
 
-    @property
-    def priority(self):
-        return 20
+    category = "dialogue"
+    priority = 20
 
     def process(self, data):
         if "Speaker" in data and "Text" in data:
@@ -87,22 +112,52 @@ class MockDialogueGenerator(BaseSentenceGenerator):
 class BrokenGenerator(BaseSentenceGenerator):
     """会抛出异常的生成器"""
 
-    param_config = {
+    param_config = MappingProxyType({
         "Broken": {"format": "{value}"}
-    }
-
-    @property
-    def category(self):
-        return "broken"
+    })
 
-    @property
-    def priority(self):
-        return 30
+    category = "broken"
+    priority = 30
 
     def process(self, data):
         raise ValueError("Intentional error for testing")
 
 
+@pytest.fixture(scope="module")
+def shared_translator():
+    """模块级共享的模拟翻译器"""
+    return Mock(spec=ParamTranslator)
+
+
+@pytest.fixture(scope="module")
+def shared_config():
+    """模块级共享的模拟配置"""
+    config = Mock(spec=EngineConfig)
+    config.engine_type = "test_engine"
+    return config
+
+
+@pytest.fixture(scope="module")
+def shared_processor(shared_translator, shared_config):
+    """
+    模块级共享的带生成器处理器
+
+    只供不修改处理器状态的测试使用，整个模块只构建一次。
+    """
+    with _swap_mgr():
+        processor = EngineProcessor("test_engine", shared_translator, shared_config)
+
+        # 按优先级顺序添加生成器
+        gen1 = MockSceneGenerator(shared_translator, shared_config)  # priority=5
+        gen2 = MockMusicGenerator(shared_translator, shared_config)  # priority=10
+        gen3 = MockDialogueGenerator(shared_translator, shared_config)  # priority=20
+
+        processor.generators = [gen1, gen2, gen3]
+        processor.generator_param_map = processor._build_generator_param_map()
+
+        return processor
+
+
 class TestEngineProcessor:
     """测试 EngineProcessor 类"""
 
@@ -122,28 +177,20 @@ class TestEngineProcessor:
     @pytest.fixture
     def mock_generator_manager(self):
         """创建模拟生成器管理器"""
-        manager = Mock(spec=SentenceGeneratorManager)
+        manager = Mock(spec_set=SentenceGeneratorManager)
         manager.load = Mock()
         return manager
 
     @pytest.fixture
     def processor(self, mock_translator, mock_config):
         """创建处理器实例"""
-        with patch('core.engine_processor.SentenceGeneratorManager') as MockManager:
-            mock_manager = Mock(spec=SentenceGeneratorManager)
-            mock_manager.load = Mock()
-            MockManager.return_value = mock_manager
-
+        with _swap_mgr():
             processor = EngineProcessor("test_engine", mock_translator, mock_config)
             return processor
 
     def test_init(self, mock_translator, mock_config):
         """测试初始化"""
-        with patch('core.engine_processor.SentenceGeneratorManager') as MockManager:
-            mock_manager = Mock(spec=SentenceGeneratorManager)
-            mock_manager.load = Mock()
-            MockManager.return_value = mock_manager
-
+        with _swap_mgr() as mock_manager:
             processor = EngineProcessor("test_engine", mock_translator, mock_config)
 
             assert processor.engine_type == "test_engine"
@@ -160,9 +207,9 @@ class TestEngineProcessor:
         mock_gen2 = MockSceneGenerator(mock_translator, mock_config)
 
         # 设置 generator_manager 的返回值
-        processor.generator_manager.create_generator_instances = Mock(
-            return_value=[mock_gen1, mock_gen2]
-        )
+        processor.generator_manager.create_generator_instances.return_value = [
+            mock_gen1, mock_gen2
+        ]
 
         processor.setup()
 
@@ -236,40 +283,13 @@ class TestEngineProcessor:
         assert param_map[gen] == []
 
 
-class TestProcessRow:
-    """测试 process_row 方法"""
+class TestProcessRowReadOnly:
+    """测试 process_row 方法（只读，共享模块级处理器）"""
 
     @pytest.fixture
-    def mock_translator(self):
-        """创建模拟翻译器"""
-        return Mock(spec=ParamTranslator)
-
-    @pytest.fixture
-    def mock_config(self):
-        """创建模拟配置"""
-        config = Mock(spec=EngineConfig)
-        config.engine_type = "test_engine"
-        return config
-
-    @pytest.fixture
-    def processor_with_generators(self, mock_translator, mock_config):
-        """创建带有生成器的处理器"""
-        with patch('core.engine_processor.SentenceGeneratorManager') as MockManager:
-            mock_manager = Mock(spec=SentenceGeneratorManager)
-            mock_manager.load = Mock()
-            MockManager.return_value = mock_manager
-
-            processor = EngineProcessor("test_engine", mock_translator, mock_config)
-
-            # 手动设置生成器
-            gen1 = MockSceneGenerator(mock_translator, mock_config)
-            gen2 = MockMusicGenerator(mock_translator, mock_config)
-            gen3 = MockDialogueGenerator(mock_translator, mock_config)
-
-            processor.generators = [gen1, gen2, gen3]
-            processor.generator_param_map = processor._build_generator_param_map()
-
-            return processor
+    def processor_with_generators(self, shared_processor):
+        """复用模块级处理器"""
+        return shared_processor
 
     def test_process_row_with_all_params(self, processor_with_generators):
         """测试处理包含所有参数的行"""
@@ -350,13 +370,31 @@ class TestProcessRow:
         # 没有生成器能处理这些参数
         assert results == []
 
+    def test_process_row_empty_row(self, processor_with_generators):
+        """测试处理空行"""
+        results = processor_with_generators.process_row(_ROW_EMPTY)
+
+        assert results == []
+
+
+class TestProcessRowMutating:
+    """测试 process_row 方法（需要独立处理器的用例）"""
+
+    @pytest.fixture
+    def mock_translator(self):
+        """创建模拟翻译器"""
+        return Mock(spec=ParamTranslator)
+
+    @pytest.fixture
+    def mock_config(self):
+        """创建模拟配置"""
+        config = Mock(spec=EngineConfig)
+        config.engine_type = "test_engine"
+        return config
+
     def test_process_row_with_generator_error(self, mock_translator, mock_config):
         """测试生成器抛出异常时的处理"""
-        with patch('core.engine_processor.SentenceGeneratorManager') as MockManager:
-            mock_manager = Mock(spec=SentenceGeneratorManager)
-            mock_manager.load = Mock()
-            MockManager.return_value = mock_manager
-
+        with _swap_mgr():
             processor = EngineProcessor("test_engine", mock_translator, mock_config)
 
             # 添加一个正常生成器和一个会出错的生成器
@@ -366,38 +404,21 @@ class TestProcessRow:
             processor.generators = [gen1, gen2]
             processor.generator_param_map = processor._build_generator_param_map()
 
-            row_data = pd.Series({
-                "Music": "bgm_main",
-                "Broken": "test"
-            })
-
             # 应该捕获异常并继续处理
-            results = processor.process_row(row_data)
+            results = processor.process_row(_ROW_MUSIC_BROKEN)
 
             # 正常生成器应该生成命令
             assert "play music bgm_main" in results
             # 出错的生成器不应该影响结果
             assert len(results) == 1
 
-    def test_process_row_empty_row(self, processor_with_generators):
-        """测试处理空行"""
-        row_data = pd.Series({})
-
-        results = processor_with_generators.process_row(row_data)
-
-        assert results == []
-
     @pytest.mark.parametrize("return_value,category_name", [
         (None, "none"),
         ([], "empty"),
     ])
     def test_process_row_generator_returns_empty(self, mock_translator, mock_config, return_value, category_name):
         """测试生成器返回 None 或空列表的情况"""
-        with patch('core.engine_processor.SentenceGeneratorManager') as MockManager:
-            mock_manager = Mock(spec=SentenceGeneratorManager)
-            mock_manager.load = Mock()
-            MockManager.return_value = mock_manager
-
+        with _swap_mgr():
             processor = EngineProcessor("test_engine", mock_translator, mock_config)
 
             # 创建一个返回指定值的生成器
@@ -415,8 +436,7 @@ class TestProcessRow:
             processor.generators = [gen]
             processor.generator_param_map = processor._build_generator_param_map()
 
-            row_data = pd.Series({"Test": "value"})
-            results = processor.process_row(row_data)
+            results = processor.process_row(_ROW_TEST)
 
             # 返回 None 或空列表的生成器不应该添加到结果中
             assert results == []
@@ -438,24 +458,9 @@ class TestPipelineInfo:
         return config
 
     @pytest.fixture
-    def processor_with_generators(self, mock_translator, mock_config):
-        """创建带有生成器的处理器"""
-        with patch('core.engine_processor.SentenceGeneratorManager') as MockManager:
-            mock_manager = Mock(spec=SentenceGeneratorManager)
-            mock_manager.load = Mock()
-            MockManager.return_value = mock_manager
-
-            processor = EngineProcessor("test_engine", mock_translator, mock_config)
-
-            # 按优先级顺序添加生成器
-            gen1 = MockSceneGenerator(mock_translator, mock_config)  # priority=5
-            gen2 = MockMusicGenerator(mock_translator, mock_config)  # priority=10
-            gen3 = MockDialogueGenerator(mock_translator, mock_config)  # priority=20
-
-            processor.generators = [gen1, gen2, gen3]
-            processor.generator_param_map = processor._build_generator_param_map()
-
-            return processor
+    def processor_with_generators(self, shared_processor):
+        """复用模块级处理器"""
+        return shared_processor
 
     def test_get_pipeline_info(self, processor_with_generators):
         """测试获取管道信息"""
@@ -490,11 +495,7 @@ class TestPipelineInfo:
 
     def test_get_pipeline_info_empty(self, mock_translator, mock_config):
         """测试获取空管道信息"""
-        with patch('core.engine_processor.SentenceGeneratorManager') as MockManager:
-            mock_manager = Mock(spec=SentenceGeneratorManager)
-            mock_manager.load = Mock()
-            MockManager.return_value = mock_manager
-
+        with _swap_mgr():
             processor = EngineProcessor("test_engine", mock_translator, mock_config)
             processor.generators = []
 
@@ -505,11 +506,7 @@ class TestPipelineInfo:
 
     def test_get_pipeline_info_with_category(self, mock_translator, mock_config):
         """测试获取管道信息（验证 category 正确获取）"""
-        with patch('core.engine_processor.SentenceGeneratorManager') as MockManager:
-            mock_manager = Mock(spec=SentenceGeneratorManager)
-            mock_manager.load = Mock()
-            MockManager.return_value = mock_manager
-
+        with _swap_mgr():
             processor = EngineProcessor("test_engine", mock_translator, mock_config)
 
             # 创建一个有 category 的生成器
@@ -527,7 +524,7 @@ class TestPipelineInfo:
         manager = processor_with_generators.get_generator_manager()
 
         assert manager is not None
-        assert isinstance(manager, (SentenceGeneratorManager, Mock))
+        assert manager is processor_with_generators.generator_manager
 
 
 class TestEngineProcessorIntegration:
@@ -547,19 +544,13 @@ class TestEngineProcessorIntegration:
 
     def test_full_workflow(self, mock_translator, mock_config):
         """测试完整工作流程"""
-        with patch('core.engine_processor.SentenceGeneratorManager') as MockManager:
-            mock_manager = Mock(spec=SentenceGeneratorManager)
-            mock_manager.load = Mock()
-
+        with _swap_mgr() as mock_manager:
             # 创建生成器实例
             gen1 = MockSceneGenerator(mock_translator, mock_config)
             gen2 = MockMusicGenerator(mock_translator, mock_config)
             gen3 = MockDialogueGenerator(mock_translator, mock_config)
 
-            mock_manager.create_generator_instances = Mock(
-                return_value=[gen1, gen2, gen3]
-            )
-            MockManager.return_value = mock_manager
+            mock_manager.create_generator_instances.return_value = [gen1, gen2, gen3]
 
             # 1. 初始化处理器
             processor = EngineProcessor("test_engine", mock_translator, mock_config)
@@ -574,46 +565,31 @@ class TestEngineProcessorIntegration:
             assert info["total_stages"] == 3
 
             # 4. 处理多行数据
-            rows = [
-                pd.Series({"Background": "bg1", "Music": "bgm1"}),
-                pd.Series({"Character": "alice", "Speaker": "Alice", "Text": "Hi"}),
-                pd.Series({"Sound": "sfx1"})
-            ]
-
             all_results = []
-            for row in rows:
+            for row in _WORKFLOW_ROWS:
                 results = processor.process_row(row)
                 all_results.extend(results)
 
             # 验证所有命令都生成了
             assert len(all_results) > 0
-            assert any("scene bg1" in cmd for cmd in all_results)
-            assert any("play music bgm1" in cmd for cmd in all_results)
-            assert any("show alice" in cmd for cmd in all_results)
-            assert any("Alice \"Hi\"" in cmd for cmd in all_results)
-            assert any("play sound sfx1" in cmd for cmd in all_results)
+            results_set = set(all_results)
+            assert "scene bg1" in results_set
+            assert "play music bgm1" in results_set
+            assert "show alice" in results_set
+            assert "Alice \"Hi\"" in results_set
+            assert "play sound sfx1" in results_set
 
     def test_multiple_rows_processing(self, mock_translator, mock_config):
         """测试处理多行数据"""
-        with patch('core.engine_processor.SentenceGeneratorManager') as MockManager:
-            mock_manager = Mock(spec=SentenceGeneratorManager)
-            mock_manager.load = Mock()
-
+        with _swap_mgr() as mock_manager:
             gen = MockMusicGenerator(mock_translator, mock_config)
-            mock_manager.create_generator_instances = Mock(return_value=[gen])
-            MockManager.return_value = mock_manager
+            mock_manager.create_generator_instances.return_value = [gen]
 
             processor = EngineProcessor("test_engine", mock_translator, mock_config)
             processor.setup()
 
             # 处理多行
-            rows = [
-                pd.Series({"Music": "bgm1"}),
-                pd.Series({"Music": "bgm2"}),
-                pd.Series({"Sound": "sfx1"}),
-            ]
-
-            results = [processor.process_row(row) for row in rows]
+            results = [processor.process_row(row) for row in _MUSIC_ROWS]
 
             # 验证每行都被正确处理
             assert len(results) == 3
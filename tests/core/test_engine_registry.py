@@ -2,7 +2,6 @@
 测试 engine_registry 模块
 """
 import pytest
-from unittest.mock import Mock
 from core.engine_registry import (
     EngineMetadata,
     EngineRegistry,
@@ -12,21 +11,41 @@ from core.config_manager import EngineConfig, RenpyConfig, NaninovelConfig
 from core.exceptions import EngineNotRegisteredError
 
 
+def _dummy_factory(*args, **kwargs):
+    """占位工厂函数，只用于填充元数据，测试中不会断言其调用情况"""
+    return None
+
+
+def _fast_register(metadata: EngineMetadata):
+    """跳过 register() 的日志与覆盖检查，直接写入注册表，仅用于准备测试状态"""
+    EngineRegistry()._engines[metadata.name] = metadata
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _clear_engine_registry():
+    """进入本模块前清空一次注册表（清除其他模块导入时注册的引擎）"""
+    EngineRegistry.reset()
+
+
+@pytest.fixture(autouse=True)
+def _reset_engine_registry():
+    """每个测试结束后重置注册表"""
+    yield
+    EngineRegistry.reset()
+
+
 class TestEngineMetadata:
     """测试 EngineMetadata 类"""
 
     def test_create_metadata(self):
         """测试创建引擎元数据"""
-        processor_factory = Mock()
-        validator_factory = Mock()
-
         metadata = EngineMetadata(
             name="test_engine",
             display_name="Test Engine",
             file_extension=".test",
             config_class=EngineConfig,
-            processor_factory=processor_factory,
-            validator_factory=validator_factory,
+            processor_factory=_dummy_factory,
+            validator_factory=_dummy_factory,
             description="A test engine"
         )
 
@@ -34,20 +53,18 @@ class TestEngineMetadata:
         assert metadata.display_name == "Test Engine"
         assert metadata.file_extension == ".test"
         assert metadata.config_class == EngineConfig
-        assert metadata.processor_factory == processor_factory
-        assert metadata.validator_factory == validator_factory
+        assert metadata.processor_factory == _dummy_factory
+        assert metadata.validator_factory == _dummy_factory
         assert metadata.description == "A test engine"
 
     def test_create_metadata_without_optional_fields(self):
         """测试创建引擎元数据（不包含可选字段）"""
-        processor_factory = Mock()
-
         metadata = EngineMetadata(
             name="minimal_engine",
             display_name="Minimal Engine",
             file_extension=".min",
             config_class=EngineConfig,
-            processor_factory=processor_factory
+            processor_factory=_dummy_factory
         )
 
         assert metadata.name == "minimal_engine"
@@ -58,13 +75,6 @@ class TestEngineMetadata:
 class TestEngineRegistry:
     """测试 EngineRegistry 类"""
 
-    @pytest.fixture(autouse=True)
-    def reset_registry(self):
-        """每个测试前重置注册表"""
-        EngineRegistry.reset()
-        yield
-        EngineRegistry.reset()
-
     def test_singleton_pattern(self):
         """测试单例模式"""
         registry1 = EngineRegistry()
@@ -74,13 +84,12 @@ class TestEngineRegistry:
 
     def test_register_engine(self):
         """测试注册引擎"""
-        processor_factory = Mock()
         metadata = EngineMetadata(
             name="renpy",
             display_name="Ren'Py",
             file_extension=".rpy",
             config_class=RenpyConfig,
-            processor_factory=processor_factory
+            processor_factory=_dummy_factory
         )
 
         EngineRegistry.register(metadata)
@@ -89,15 +98,12 @@ class TestEngineRegistry:
 
     def test_register_duplicate_engine(self):
         """测试注册重复引擎（应该覆盖）"""
-        processor_factory1 = Mock()
-        processor_factory2 = Mock()
-
         metadata1 = EngineMetadata(
             name="test",
             display_name="Test 1",
             file_extension=".test",
             config_class=EngineConfig,
-            processor_factory=processor_factory1
+            processor_factory=_dummy_factory
         )
 
         metadata2 = EngineMetadata(
@@ -105,7 +111,7 @@ class TestEngineRegistry:
             display_name="Test 2",
             file_extension=".test2",
             config_class=EngineConfig,
-            processor_factory=processor_factory2
+            processor_factory=_dummy_factory
         )
 
         EngineRegistry.register(metadata1)
@@ -118,13 +124,12 @@ class TestEngineRegistry:
 
     def test_get_registered_engine(self):
         """测试获取已注册引擎"""
-        processor_factory = Mock()
         metadata = EngineMetadata(
             name="naninovel",
             display_name="Naninovel",
             file_extension=".nani",
             config_class=NaninovelConfig,
-            processor_factory=processor_factory,
+            processor_factory=_dummy_factory,
             description="Naninovel engine"
         )
 
@@ -144,13 +149,12 @@ class TestEngineRegistry:
 
     def test_is_registered_true(self):
         """测试检查已注册引擎"""
-        processor_factory = Mock()
         metadata = EngineMetadata(
             name="test",
             display_name="Test",
             file_extension=".test",
             config_class=EngineConfig,
-            processor_factory=processor_factory
+            processor_factory=_dummy_factory
         )
 
         EngineRegistry.register(metadata)
@@ -170,15 +174,12 @@ class TestEngineRegistry:
 
     def test_list_engines_with_multiple_engines(self):
         """测试列出多个引擎"""
-        processor1 = Mock()
-        processor2 = Mock()
-
         metadata1 = EngineMetadata(
             name="renpy",
             display_name="Ren'Py",
             file_extension=".rpy",
             config_class=RenpyConfig,
-            processor_factory=processor1
+            processor_factory=_dummy_factory
         )
 
         metadata2 = EngineMetadata(
@@ -186,11 +187,11 @@ class TestEngineRegistry:
             display_name="Naninovel",
             file_extension=".nani",
             config_class=NaninovelConfig,
-            processor_factory=processor2
+            processor_factory=_dummy_factory
         )
 
-        EngineRegistry.register(metadata1)
-        EngineRegistry.register(metadata2)
+        _fast_register(metadata1)
+        _fast_register(metadata2)
 
         engines = EngineRegistry.list_engines()
 
@@ -202,16 +203,15 @@ class TestEngineRegistry:
 
     def test_list_engines_returns_copy(self):
         """测试 list_engines 返回副本（不影响原注册表）"""
-        processor = Mock()
         metadata = EngineMetadata(
             name="test",
             display_name="Test",
             file_extension=".test",
             config_class=EngineConfig,
-            processor_factory=processor
+            processor_factory=_dummy_factory
         )
 
-        EngineRegistry.register(metadata)
+        _fast_register(metadata)
         engines = EngineRegistry.list_engines()
 
         # 修改返回的字典
@@ -222,16 +222,15 @@ class TestEngineRegistry:
 
     def test_reset_registry(self):
         """测试重置注册表"""
-        processor = Mock()
         metadata = EngineMetadata(
             name="test",
             display_name="Test",
             file_extension=".test",
             config_class=EngineConfig,
-            processor_factory=processor
+            processor_factory=_dummy_factory
         )
 
-        EngineRegistry.register(metadata)
+        _fast_register(metadata)
         assert EngineRegistry.is_registered("test") is True
 
         EngineRegistry.reset()
@@ -242,13 +241,6 @@ class TestEngineRegistry:
 class TestRegisterEngineDecorator:
     """测试 register_engine 装饰器"""
 
-    @pytest.fixture(autouse=True)
-    def reset_registry(self):
-        """每个测试前重置注册表"""
-        EngineRegistry.reset()
-        yield
-        EngineRegistry.reset()
-
     def test_register_engine_decorator_basic(self):
         """测试基础装饰器功能"""
         @register_engine(
@@ -258,7 +250,7 @@ class TestRegisterEngineDecorator:
             config_class=EngineConfig
         )
         def create_processor():
-            return Mock()
+            return "processor"
 
         # 验证引擎已注册
         assert EngineRegistry.is_registered("test_engine")
@@ -275,25 +267,23 @@ class TestRegisterEngineDecorator:
 
     def test_register_engine_decorator_with_all_params(self):
         """测试装饰器包含所有参数"""
-        validator = Mock()
-
         @register_engine(
             name="full_engine",
             display_name="Full Engine",
             file_extension=".full",
             config_class=RenpyConfig,
-            validator_factory=validator,
+            validator_factory=_dummy_factory,
             description="A fully configured engine"
         )
         def create_processor():
-            return Mock()
+            return "processor"
 
         metadata = EngineRegistry.get("full_engine")
         assert metadata.name == "full_engine"
         assert metadata.display_name == "Full Engine"
         assert metadata.file_extension == ".full"
         assert metadata.config_class == RenpyConfig
-        assert metadata.validator_factory == validator
+        assert metadata.validator_factory == _dummy_factory
         assert metadata.description == "A fully configured engine"
 
     def test_register_engine_decorator_preserves_function(self):
@@ -342,13 +332,6 @@ class TestRegisterEngineDecorator:
 class TestEngineRegistryIntegration:
     """集成测试：测试完整的引擎注册和使用流程"""
 
-    @pytest.fixture(autouse=True)
-    def reset_registry(self):
-        """每个测试前重置注册表"""
-        EngineRegistry.reset()
-        yield
-        EngineRegistry.reset()
-
     def test_full_workflow(self):
         """测试完整工作流程"""
         # 1. 使用装饰器注册引擎
@@ -380,23 +363,20 @@ class TestEngineRegistryIntegration:
     def test_multiple_engines_workflow(self):
         """测试多引擎工作流程"""
         # 注册多个引擎
-        @register_engine(
+        EngineRegistry.register(EngineMetadata(
             name="renpy",
             display_name="Ren'Py",
             file_extension=".rpy",
-            config_class=RenpyConfig
-        )
-        def create_renpy():
-            return "renpy_processor"
-
-        @register_engine(
+            config_class=RenpyConfig,
+            processor_factory=lambda: "renpy_processor"
+        ))
+        EngineRegistry.register(EngineMetadata(
             name="naninovel",
             display_name="Naninovel",
             file_extension=".nani",
-            config_class=NaninovelConfig
-        )
-        def create_naninovel():
-            return "naninovel_processor"
+            config_class=NaninovelConfig,
+            processor_factory=lambda: "naninovel_processor"
+        ))
 
         # 验证所有引擎
         engines = EngineRegistry.list_engines()
@@ -6,12 +6,22 @@ ExcelReader模块的单元测试
 import pytest
 import pandas as pd
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import Mock
 
-from core.excel_management import ExcelFileManager, DataFrameProcessor
+from openpyxl import Workbook, load_workbook
+
+from core.excel_management import ExcelFileManager, DataFrameProcessor, ExcelEditor
 from core.config_manager import AppConfig
 
 
+# 导入时构建一次的示例数据
+_SAMPLE_DF = pd.DataFrame({
+    "Name": ["Alice", "Bob", "Charlie", "END", "Extra"],
+    "Text": ["Hello", "Hi", "Hey", "Goodbye", "ShouldNotBeHere"],
+    "Note": ["", "", "", "END", ""]
+})
+
+
 class TestExcelFileManager:
     """ExcelFileManager的测试类"""
     
@@ -42,21 +52,105 @@ class TestExcelFileManager:
             assert isinstance(df, pd.DataFrame)
             # 不检查是否为空，因为测试文件可能为空
     
-    def test_cache_functionality(self, sample_excel_file):
+    def test_cache_functionality(self, sample_excel_file, cached_excel_manager, monkeypatch):
         """测试缓存功能"""
-        # 创建启用缓存的manager
-        cached_manager = ExcelFileManager(cache_enabled=True)
-        
-        # 第一次加载
-        data1 = cached_manager.load_excel(sample_excel_file)
-        
-        # 第二次加载应该从缓存获取
-        with patch('pandas.read_excel') as mock_read:
-            data2 = cached_manager.load_excel(sample_excel_file)
-            mock_read.assert_not_called()  # 不应该调用read_excel
+        # 会话级 manager 已经加载过一次，这里只验证命中缓存
+        cached_manager, data1 = cached_excel_manager
+
+        # 第二次加载应该从缓存获取，不应该调用read_excel
+        def fail_on_read(*args, **kwargs):
+            pytest.fail("缓存未命中，调用了 read_excel")
+
+        monkeypatch.setattr(pd, "read_excel", fail_on_read)
+        data2 = cached_manager.load_excel(sample_excel_file)
         
         assert data1 is data2  # 应该是同一个对象
 
+    def test_load_excel_uses_read_engine(self, sample_excel_file, monkeypatch):
+        """测试 load_excel 把 read_engine 传给 pd.read_excel"""
+        seen = {}
+
+        def fake_read_excel(*args, **kwargs):
+            seen.update(kwargs)
+            return {"Sheet1": _SAMPLE_DF.copy()}
+
+        monkeypatch.setattr(pd, "read_excel", fake_read_excel)
+        manager = ExcelFileManager(cache_enabled=False, read_engine="openpyxl")
+        manager.load_excel(sample_excel_file)
+
+        assert seen["engine"] == "openpyxl"
+
+    def test_load_excel_keeps_na_like_text(self, tmp_path):
+        """测试 "None"、"NA" 等文本按原样读取，空单元格读成空字符串"""
+        file_path = tmp_path / "params.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["ExcelParam", "ScenarioParam"])
+        ws.append(["无", "None"])
+        ws.append(["NA", None])
+        wb.save(file_path)
+
+        df = self.manager.load_excel(file_path)["Sheet"]
+
+        assert df.to_dict("list") == {"ExcelParam": ["无", "NA"], "ScenarioParam": ["None", ""]}
+
+
+class TestExcelEditor:
+    """ExcelEditor的测试类"""
+
+    def test_update_parameter_sheet_centers_all_cells(self, tmp_path):
+        """测试参数表的表头和参数值都写成居中对齐"""
+        file_path = tmp_path / "scenario.xlsx"
+        wb = Workbook()
+        wb.active.title = "参数表"
+        wb.save(file_path)
+
+        ExcelEditor().update_parameter_sheet(
+            file_path, "参数表", {"Music": ["音乐1", "音乐2"], "Sound": ["音效1"]}
+        )
+
+        ws = load_workbook(file_path)["参数表"]
+        cells = [cell for row in ws.iter_rows() for cell in row if cell.value is not None]
+        assert [cell.value for cell in cells] == ["Music", "Sound", "音乐1", "音效1", "音乐2"]
+        assert all(cell.alignment.horizontal == "center" for cell in cells)
+        assert all(cell.alignment.vertical == "center" for cell in cells)
+
+    def test_update_parameter_sheet_fixes_existing_named_range(self, tmp_path):
+        """测试已存在但公式过期的命名区域被改成新列的公式"""
+        from openpyxl.workbook.defined_name import DefinedName
+
+        file_path = tmp_path / "scenario.xlsx"
+        wb = Workbook()
+        wb.active.title = "参数表"
+        wb.defined_names["MusicList"] = DefinedName(name="MusicList", attr_text="参数表!$Z$2:$Z$3")
+        wb.save(file_path)
+
+        ExcelEditor().update_parameter_sheet(file_path, "参数表", {"Music": ["音乐1"]})
+
+        defined_names = load_workbook(file_path).defined_names
+        assert defined_names["MusicList"].attr_text == "OFFSET(参数表!$A$2,0,0,COUNTA(参数表!$A:$A)-1,1)"
+
+    def test_update_parameter_sheet_skips_save_when_unchanged(self, tmp_path, monkeypatch):
+        """测试参数表内容和命名区域都一致时不重写、不保存"""
+        file_path = tmp_path / "scenario.xlsx"
+        wb = Workbook()
+        wb.active.title = "参数表"
+        wb.save(file_path)
+
+        editor = ExcelEditor()
+        parameter_data = {"Music": ["音乐1", "音乐2"], "Sound": []}
+        editor.update_parameter_sheet(file_path, "参数表", parameter_data)
+
+        saved = []
+        original_save = Workbook.save
+        monkeypatch.setattr(Workbook, "save", lambda self, path: saved.append(path) or original_save(self, path))
+
+        assert editor.update_parameter_sheet(file_path, "参数表", parameter_data) is True
+        assert saved == []
+
+        assert editor.update_parameter_sheet(file_path, "参数表", {"Music": ["音乐1"], "Sound": []}) is True
+        assert saved == [file_path]
+
 
 class TestDataFrameProcessor:
     """DataFrameProcessor的测试类"""
@@ -75,7 +169,7 @@ class TestDataFrameProcessor:
         
         # 应该只返回END标记之前的行
         assert len(result) == 3
-        assert "END" not in result["Note"].values
+        assert "END" not in result["Note"].to_numpy(copy=False)
     
     def test_extract_valid_rows_no_end_marker(self):
         """测试没有END标记的情况"""
@@ -97,8 +191,8 @@ class TestDataFrameProcessor:
         
         # 应该过滤掉标记为IGNORE和SKIP的行
         assert len(result) == 3
-        assert "IGNORE" not in result["Ignore"].values
-        assert "SKIP" not in result["Ignore"].values
+        assert "IGNORE" not in result["Ignore"].to_numpy(copy=False)
+        assert "SKIP" not in result["Ignore"].to_numpy(copy=False)
     
     def test_find_marker_position(self, sample_dataframe):
         """测试查找标记位置"""
@@ -106,22 +200,29 @@ class TestDataFrameProcessor:
             sample_dataframe, "Note", "END"
         )
         assert position == 3
+
+    def test_find_marker_position_is_positional(self):
+        """测试返回的是位置（供 iloc 使用）而不是索引标签，找不到时返回 -1"""
+        df = pd.DataFrame({"Note": ["", "END", "END"]}, index=[10, 20, 30])
+
+        assert self.processor.find_marker_position(df, "Note", "END") == 1
+        assert self.processor.find_marker_position(df, "Note", "MISSING") == -1
     
     def test_get_column_data_existing(self, sample_dataframe):
         """测试获取存在的列数据"""
         series = self.processor.get_column_data(sample_dataframe, "Text")
         assert len(series) == len(sample_dataframe)
-        assert series.iloc[0] == "Hello"
+        assert series.iat[0] == "Hello"
     
     def test_get_column_data_missing(self, sample_dataframe):
         """测试获取不存在的列数据"""
         series = self.processor.get_column_data(sample_dataframe, "NonExistent")
         assert len(series) == len(sample_dataframe)
-        assert series.iloc[0] == ""  # 默认值
+        assert series.iat[0] == ""  # 默认值
 
 
 # 测试固件（Fixtures）
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_excel_file():
     """使用项目中已有的测试Excel文件"""
     test_file_path = Path("tests/excel/test_sample_excel.xlsx")
@@ -132,11 +233,14 @@ def sample_excel_file():
     return test_file_path
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def cached_excel_manager(sample_excel_file):
+    """启用缓存并已预加载测试Excel文件的 manager，整个会话只解析一次"""
+    manager = ExcelFileManager(cache_enabled=True)
+    return manager, manager.load_excel(sample_excel_file)
+
+
+@pytest.fixture(scope="session")
 def sample_dataframe():
-    """创建示例DataFrame用于测试（不依赖外部文件）"""
-    return pd.DataFrame({
-        "Name": ["Alice", "Bob", "Charlie", "END", "Extra"],
-        "Text": ["Hello", "Hi", "Hey", "Goodbye", "ShouldNotBeHere"],
-        "Note": ["", "", "", "END", ""]
-    })
\ No newline at end of file
+    """示例DataFrame（不依赖外部文件，所有测试共享同一对象，需修改时请先 copy）"""
+    return _SAMPLE_DF
\ No newline at end of file
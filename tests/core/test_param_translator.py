@@ -4,16 +4,17 @@
 import pytest
 import tempfile
 from pathlib import Path
+from core import param_translator
 from core.param_translator import ParamTranslator
 
 
 class TestParamTranslator:
     """测试 ParamTranslator 类"""
 
-    @pytest.fixture
-    def mock_param_mappings_file(self, tmp_path):
-        """创建模拟的参数映射文件"""
-        mappings_file = tmp_path / "param_mappings.py"
+    @pytest.fixture(scope="session")
+    def mock_param_mappings_file(self, tmp_path_factory):
+        """创建模拟的参数映射文件（整个测试会话只写一次）"""
+        mappings_file = tmp_path_factory.mktemp("param_translator") / "param_mappings.py"
         mappings_content = """
 PARAM_MAPPINGS = {
     "Music": {
@@ -38,10 +39,10 @@ PARAM_MAPPINGS = {
         mappings_file.write_text(mappings_content, encoding="utf-8")
         return mappings_file
 
-    @pytest.fixture
-    def mock_varient_mappings_file(self, tmp_path):
-        """创建模拟的差分参数映射文件"""
-        varient_file = tmp_path / "varient_mappings.py"
+    @pytest.fixture(scope="session")
+    def mock_varient_mappings_file(self, mock_param_mappings_file):
+        """创建模拟的差分参数映射文件（与参数映射文件同目录）"""
+        varient_file = mock_param_mappings_file.parent / "varient_mappings.py"
         varient_content = """
 VARIENT_MAPPINGS = {
     "角色A": {
@@ -71,6 +72,52 @@ VARIENT_MAPPINGS = {
         assert len(translator.mappings) == 4
         assert len(translator.varient_mappings) == 2
 
+    def test_mappings_loaded_once_per_file(self, tmp_path, monkeypatch):
+        """测试同一个未修改的映射文件只解析一次，但每个实例持有自己的映射"""
+        mappings_file = tmp_path / "param_mappings.py"
+        mappings_file.write_text('PARAM_MAPPINGS = {"Music": {"音乐1": "music1"}}\n', encoding="utf-8")
+
+        parse_calls = []
+        original_parse = param_translator._parse_literal_assignments
+
+        def counting_parse(source):
+            parse_calls.append(source)
+            return original_parse(source)
+
+        monkeypatch.setattr(param_translator, "_parse_literal_assignments", counting_parse)
+        first = ParamTranslator(module_file=str(mappings_file), varient_module_file="")
+        second = ParamTranslator(module_file=str(mappings_file), varient_module_file="")
+
+        assert len(parse_calls) == 1
+        assert first.mappings == second.mappings
+        assert first.mappings["Music"] is not second.mappings["Music"]
+
+        first.mappings["Music"]["音乐1"] = "changed"
+        assert second.translate("Music", "音乐1") == "music1"
+
+    def test_mappings_reloaded_after_file_change(self, tmp_path):
+        """测试映射文件被重新生成后会重新加载"""
+        mappings_file = tmp_path / "param_mappings.py"
+        mappings_file.write_text('PARAM_MAPPINGS = {"Music": {"音乐1": "music1"}}\n', encoding="utf-8")
+        before = ParamTranslator(module_file=str(mappings_file), varient_module_file="")
+
+        mappings_file.write_text('PARAM_MAPPINGS = {"Music": {"音乐1": "music_new"}}\n', encoding="utf-8")
+        after = ParamTranslator(module_file=str(mappings_file), varient_module_file="")
+
+        assert before.translate("Music", "音乐1") == "music1"
+        assert after.translate("Music", "音乐1") == "music_new"
+
+    def test_non_literal_mappings_module(self, tmp_path):
+        """测试包含非字面量语句的映射模块仍按模块方式加载"""
+        mappings_file = tmp_path / "param_mappings.py"
+        mappings_file.write_text(
+            'PARAM_MAPPINGS = dict(Music={"音乐1": "music1"})\n',
+            encoding="utf-8"
+        )
+        translator = ParamTranslator(module_file=str(mappings_file), varient_module_file="")
+
+        assert translator.translate("Music", "音乐1") == "music1"
+
     def test_init_with_missing_files(self, tmp_path):
         """测试文件不存在时的初始化"""
         translator = ParamTranslator(
@@ -93,6 +140,9 @@ VARIENT_MAPPINGS = {
         ("NotExistType", "任意值", "任意值"),
         # 空字符串
         ("Music", "", ""),
+    ], ids=[
+        "music1", "music2", "speaker_a", "background1",
+        "missing_music", "missing_speaker", "missing_type", "empty",
     ])
     def test_translate(self, translator, param_type, param_value, expected):
         """测试参数翻译"""
@@ -112,6 +162,10 @@ VARIENT_MAPPINGS = {
         ("开心", "不存在的角色", "开心"),
         # 角色存在但参数不存在，返回原值
         ("不存在的表情", "角色A", "不存在的表情"),
+    ], ids=[
+        "base_varient1", "base_varient2", "base_missing",
+        "role_a_happy", "role_a_sad", "role_b_angry", "role_b_surprised",
+        "missing_role", "missing_varient",
     ])
     def test_translate_varient(self, translator, param_value, role, expected):
         """测试差分参数翻译"""
@@ -138,45 +192,32 @@ VARIENT_MAPPINGS = {
         assert "Varient" in types
         assert len(types) == 4
 
-    @pytest.mark.parametrize("param_type,expected_result", [
-        ("Music", ["音乐1", "音乐2", "背景音乐"]),
-        ("NotExist", []),
-    ])
-    def test_get_params_for_type(self, translator, param_type, expected_result):
-        """测试获取指定类型的所有原始参数"""
+    @pytest.mark.parametrize("param_type,expected_params,expected_translations", [
+        ("Music", ["音乐1", "音乐2", "背景音乐"], ["music1", "music2", "bgm_main"]),
+        ("NotExist", [], []),
+    ], ids=["music", "missing_type"])
+    def test_get_params_and_translations_for_type(
+        self, translator, param_type, expected_params, expected_translations
+    ):
+        """测试获取指定类型的所有原始参数和翻译后参数"""
         params = translator.get_params_for_type(param_type)
-        if expected_result:
-            for expected_param in expected_result:
-                assert expected_param in params
-            assert len(params) == len(expected_result)
-        else:
-            assert params == []
-
-    @pytest.mark.parametrize("param_type,expected_result", [
-        ("Music", ["music1", "music2", "bgm_main"]),
-        ("NotExist", []),
-    ])
-    def test_get_translations_for_type(self, translator, param_type, expected_result):
-        """测试获取指定类型的所有翻译后参数"""
         translations = translator.get_translations_for_type(param_type)
-        if expected_result:
-            for expected_translation in expected_result:
-                assert expected_translation in translations
-            assert len(translations) == len(expected_result)
-        else:
-            assert translations == []
 
-    @pytest.mark.parametrize("param_type,param_value,expected", [
-        # 存在的映射
-        ("Music", "音乐1", True),
-        ("Speaker", "角色A", True),
-        # 不存在的映射
-        ("Music", "不存在", False),
-        ("NotExist", "任意值", False),
-    ])
-    def test_has_mapping(self, translator, param_type, param_value, expected):
+        assert sorted(params) == sorted(expected_params)
+        assert sorted(translations) == sorted(expected_translations)
+
+    def test_has_mapping(self, translator):
         """测试检查映射是否存在"""
-        assert translator.has_mapping(param_type, param_value) is expected
+        cases = [
+            # 存在的映射
+            ("Music", "音乐1", True),
+            ("Speaker", "角色A", True),
+            # 不存在的映射
+            ("Music", "不存在", False),
+            ("NotExist", "任意值", False),
+        ]
+        for param_type, param_value, expected in cases:
+            assert translator.has_mapping(param_type, param_value) is expected, (param_type, param_value)
 
     def test_special_characters_in_param(self, tmp_path):
         """测试包含特殊字符的参数"""
@@ -0,0 +1,118 @@
+"""
+测试 ResourceExtractor 类
+"""
+import pandas as pd
+import pytest
+
+from core.resource_extractor import ResourceExtractor
+
+
+class _MusicGenerator:
+    """只声明资源配置的生成器替身"""
+
+    resource_config = {
+        "resource_type": "Music",
+        "resource_category": "音频",
+        "main_param": "Music",
+        "folder": "audio/music",
+    }
+
+
+class _CharacterGenerator:
+    """带差分参数和多个资源配置的生成器替身"""
+
+    resource_config = {
+        "resource_type": "Character",
+        "resource_category": "图片",
+        "main_param": "Speaker",
+        "part_params": ["Varient"],
+        "folder": "images/characters",
+    }
+    resource_config_event = {
+        "resource_type": "Event",
+        "resource_category": "图片",
+        "main_param": "Event",
+        "folder": "images/events",
+    }
+
+
+class _StubTranslator:
+    """只认识 Music 和 Varient 两种映射的翻译器替身"""
+
+    _MAPPINGS = {
+        "Music": {"音乐1": "bgm01"},
+        "Varient": {"开心": "happy"},
+    }
+
+    def has_mapping(self, param_type, value):
+        return value in self._MAPPINGS.get(param_type, {})
+
+    def translate(self, param_type, value):
+        return self._MAPPINGS[param_type][value]
+
+
+class _StubGeneratorManager:
+    def create_generator_instances(self, translator, engine_config):
+        return [_MusicGenerator(), _CharacterGenerator()]
+
+
+@pytest.fixture
+def extractor():
+    """创建完成 setup 的提取器"""
+    extractor = ResourceExtractor(_StubGeneratorManager(), _StubTranslator(), engine_config=None)
+    extractor.setup()
+    return extractor
+
+
+class TestResourceExtractor:
+    """测试 ResourceExtractor 类"""
+
+    def test_extract_from_row(self, extractor):
+        """测试单行提取：主参数翻译、差分拼接、空值跳过"""
+        row = {"Music": "音乐1", "Speaker": "alice", "Varient": "开心", "Event": ""}
+
+        assert extractor.extract_from_row(row) == {
+            "Music": {"bgm01"},
+            "Character": {"alice happy"},
+        }
+
+    def test_extract_from_excel(self, extractor):
+        """测试按类别汇总、跳过参数表、只处理 END 之前的行"""
+        excel_data = {
+            "第一章": pd.DataFrame({
+                "Music": ["音乐1", "", "音乐2", "after_end"],
+                "Speaker": ["alice", "bob", "", ""],
+                "Note": ["", "", "", "END"],
+            }),
+            # 没有任何资源列的工作表
+            "备注": pd.DataFrame({"Text": ["hello", ""], "Note": ["", "END"]}),
+            "参数表": pd.DataFrame({"Music": ["不应提取"], "Note": ["END"]}),
+        }
+
+        result = extractor.extract_from_excel(excel_data)
+
+        assert result == {
+            "音频": {"Music": {"bgm01", "音乐2"}},
+            "图片": {"Character": {"alice", "bob"}},
+        }
+
+    def test_translation_is_cached(self, extractor, monkeypatch):
+        """测试相同 (参数类型, 值) 只向翻译器查询一次"""
+        lookups = []
+        has_mapping = extractor.translator.has_mapping
+
+        def counting_has_mapping(param_type, value):
+            lookups.append((param_type, value))
+            return has_mapping(param_type, value)
+
+        monkeypatch.setattr(extractor.translator, "has_mapping", counting_has_mapping)
+        for _ in range(3):
+            extractor.extract_from_row({"Music": "音乐1", "Speaker": "alice", "Varient": "开心"})
+
+        assert sorted(lookups) == [("Character", "alice"), ("Music", "音乐1"), ("Varient", "开心")]
+
+    def test_resource_configs(self, extractor):
+        """测试 setup 后按生成器顺序展平资源配置"""
+        assert [config["resource_type"] for config in extractor.resource_configs] == [
+            "Music", "Character", "Event"
+        ]
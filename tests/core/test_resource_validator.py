@@ -0,0 +1,125 @@
+"""
+测试 ResourceValidator 类
+"""
+import os
+import unicodedata
+from pathlib import Path
+
+import pytest
+
+from core.resource_validator import ResourceValidator
+
+
+@pytest.fixture
+def libraries(tmp_path):
+    """创建项目库和资源库目录"""
+    project_root = tmp_path / "project"
+    source_root = tmp_path / "source"
+    (project_root / "audio" / "music").mkdir(parents=True)
+    (source_root / "audio" / "music" / "sub").mkdir(parents=True)
+    return project_root, source_root
+
+
+class TestResourceValidator:
+    """测试 ResourceValidator 类"""
+
+    def test_validate_in_library(self, libraries):
+        """测试按扩展名顺序查找、子目录资源名和文件夹不存在的情况"""
+        project_root, source_root = libraries
+        folder = source_root / "audio" / "music"
+        (folder / "bgm01.ogg").touch()
+        (folder / "bgm01.mp3").touch()
+        (folder / "bgm02.mp3").touch()
+        (folder / "sub" / "bgm03.ogg").touch()
+        validator = ResourceValidator(project_root, source_root, {})
+
+        results = validator._validate_in_library(
+            folder, {"bgm01", "bgm02", "sub/bgm03", "missing"}, [".ogg", ".mp3"]
+        )
+
+        assert results == {
+            "bgm01": "bgm01.ogg",
+            "bgm02": "bgm02.mp3",
+            "sub/bgm03": "bgm03.ogg",
+            "missing": "",
+        }
+        assert validator._validate_in_library(
+            project_root / "nowhere", {"bgm01"}, [".ogg"]
+        ) == {"bgm01": ""}
+
+    def test_folder_listing_reused_until_folder_changes(self, libraries, monkeypatch):
+        """测试文件夹未变化时复用列表，增加文件后重新列出"""
+        project_root, source_root = libraries
+        folder = project_root / "audio" / "music"
+        (folder / "bgm01.ogg").touch()
+        validator = ResourceValidator(project_root, source_root, {})
+        scans = []
+        scandir = os.scandir
+
+        def counting_scandir(path):
+            scans.append(path)
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", counting_scandir)
+        validator._validate_in_library(folder, {"bgm01"}, [".ogg"])
+        validator._validate_in_library(folder, {"bgm01"}, [".ogg"])
+        assert len(scans) == 1
+
+        (folder / "bgm02.ogg").touch()
+        stat = folder.stat()
+        os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert validator._validate_in_library(folder, {"bgm02"}, [".ogg"]) == {"bgm02": "bgm02.ogg"}
+        assert len(scans) == 2
+
+    def test_nfd_file_name_falls_back_to_file_system(self, libraries, monkeypatch):
+        """测试磁盘上是 NFD 形式、资源名是 NFC 形式时仍交给文件系统判断（macOS）"""
+        project_root, source_root = libraries
+        folder = project_root / "audio" / "music"
+        (folder / unicodedata.normalize("NFD", "ガイド.ogg")).touch()
+        validator = ResourceValidator(project_root, source_root, {})
+
+        def normalizing_exists(path):
+            # 模拟 macOS 文件系统：NFC 与 NFD 形式的文件名视为同一个
+            target = unicodedata.normalize("NFC", path.name)
+            return any(unicodedata.normalize("NFC", name) == target for name in os.listdir(path.parent))
+
+        monkeypatch.setattr(Path, "exists", normalizing_exists)
+        resource_name = unicodedata.normalize("NFC", "ガイド")
+        results = validator._validate_in_library(folder, {resource_name}, [".ogg"])
+
+        assert results == {resource_name: f"{resource_name}.ogg"}
+
+    def test_validate_resources(self, libraries):
+        """测试项目库与资源库的对比结果"""
+        project_root, source_root = libraries
+        (project_root / "audio" / "music" / "bgm01.ogg").touch()
+        (source_root / "audio" / "music" / "bgm01.ogg").touch()
+        (source_root / "audio" / "music" / "bgm02.ogg").touch()
+        validator = ResourceValidator(project_root, source_root, {"音频": [".ogg"]})
+
+        results = validator.validate_resources(
+            {"音频": {"Music": {"bgm01", "bgm02", "bgm03"}}}, {"Music": "audio/music"}
+        )
+
+        assert results["project"]["Music"] == {"bgm01": "bgm01.ogg", "bgm02": "", "bgm03": ""}
+        assert results["source"]["Music"]["bgm02"] == "bgm02.ogg"
+
+    def test_compare_results(self, libraries):
+        """测试对比结果的分类"""
+        project_root, source_root = libraries
+        validator = ResourceValidator(project_root, source_root, {})
+        names = ["both", "project_only", "source_only", "neither"]
+        project_results = {"both": "both.ogg", "project_only": "project_only.ogg"}
+        source_results = {"both": "both.ogg", "source_only": "source_only.ogg"}
+
+        comparison = validator._compare_results(names, project_results, source_results)
+
+        assert comparison == {
+            "project_found": ["both", "project_only"],
+            "project_missing": ["source_only", "neither"],
+            "source_found": ["both", "source_only"],
+            "source_missing": ["project_only", "neither"],
+            "missing_in_project_but_in_source": ["source_only"],
+            "missing_in_both": ["neither"],
+        }
@@ -1,12 +1,14 @@
 """
 测试 sentence_generator_manager 模块
 """
+import importlib
+import pkgutil
+from types import MappingProxyType
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch
 from core.sentence_generator_manager import SentenceGeneratorManager
 from core.base_sentence_generator import BaseSentenceGenerator
-from core.param_translator import ParamTranslator
-from core.config_manager import EngineConfig
 from core.exceptions import GeneratorError
 
 
@@ -66,14 +68,71 @@ class MockGenerator3(BaseSentenceGenerator):
         return ["mock3 command"]
 
 
+# MockGenerator1 + MockGenerator2 的参数名（按字母顺序）
+_EXPECTED_PARAM_NAMES = ("Background", "Character", "Music", "Sound")
+
+
+class _FakePackage:
+    """只提供 __path__ 的生成器包替身"""
+    __path__ = []
+
+
+_FAKE_PACKAGE = _FakePackage()
+
+
+# 有重叠参数配置的生成器（用于测试配置合并）
+class OverlapGenerator1(BaseSentenceGenerator):
+    """重叠配置生成器 1"""
+
+    param_config = {"Music": {"format": "play {value}"}}
+
+    @property
+    def category(self):
+        return "gen1"
+
+    def process(self, data):
+        return []
+
+
+class OverlapGenerator2(BaseSentenceGenerator):
+    """重叠配置生成器 2"""
+
+    param_config = {
+        "Music": {"format": "music {value}"},  # 重复的键
+        "Sound": {"format": "sound {value}"}
+    }
+
+    @property
+    def category(self):
+        return "gen2"
+
+    def process(self, data):
+        return []
+
+
+@pytest.fixture(scope="session")
+def collected_param_configs():
+    """三个测试生成器收集出的参数配置（只读，会话内只收集一次）"""
+    manager = SentenceGeneratorManager("test_engine")
+    manager.generator_classes = [MockGenerator1, MockGenerator2, MockGenerator3]
+    manager._collect_param_configs()
+    return MappingProxyType(manager.param_configs)
+
+
+@pytest.fixture
+def make_loaded_manager():
+    """创建已标记为加载完成的管理器，跳过生成器发现"""
+    def _make(generator_classes=()):
+        manager = SentenceGeneratorManager("test_engine")
+        manager.generator_classes = list(generator_classes)
+        manager._loaded = True
+        return manager
+    return _make
+
+
 class TestSentenceGeneratorManager:
     """测试 SentenceGeneratorManager 类"""
 
-    @pytest.fixture
-    def manager(self):
-        """创建管理器实例"""
-        return SentenceGeneratorManager("test_engine")
-
     def test_init(self, manager):
         """测试初始化"""
         assert manager.engine_type == "test_engine"
@@ -106,7 +165,7 @@ class TestSentenceGeneratorManager:
         ("not a class", False),
         (123, False),
         (None, False),
-    ])
+    ], ids=["mock1", "mock2", "base", "str", "int", "none"])
     def test_is_generator_class(self, manager, obj, expected):
         """测试 _is_generator_class 方法"""
         assert manager._is_generator_class(obj) is expected
@@ -145,20 +204,19 @@ class TestSentenceGeneratorManager:
         # MockGenerator3 没有 param_config，应该为空
         assert manager.param_configs == {}
 
-    def test_get_all_param_names(self, manager):
+    def test_get_all_param_names(self, make_loaded_manager):
         """测试获取所有参数名称"""
-        manager.generator_classes = [MockGenerator1, MockGenerator2]
-        manager._loaded = True
+        manager = make_loaded_manager([MockGenerator1, MockGenerator2])
         manager._collect_param_configs()
 
         param_names = manager.get_all_param_names()
 
         # 应该按字母顺序排序
-        assert param_names == ["Background", "Character", "Music", "Sound"]
+        assert tuple(param_names) == _EXPECTED_PARAM_NAMES
 
-    def test_get_all_param_names_empty(self, manager):
+    def test_get_all_param_names_empty(self, make_loaded_manager):
         """测试获取空参数列表"""
-        manager._loaded = True
+        manager = make_loaded_manager()
         param_names = manager.get_all_param_names()
 
         assert param_names == []
@@ -173,25 +231,9 @@ class TestSentenceGeneratorManager:
 class TestCreateGeneratorInstances:
     """测试创建生成器实例"""
 
-    @pytest.fixture
-    def manager(self):
-        """创建管理器实例"""
-        return SentenceGeneratorManager("test_engine")
-
-    @pytest.fixture
-    def mock_translator(self):
-        """创建模拟翻译器"""
-        return Mock(spec=ParamTranslator)
-
-    @pytest.fixture
-    def mock_config(self):
-        """创建模拟配置"""
-        return Mock(spec=EngineConfig)
-
-    def test_create_generator_instances(self, manager, mock_translator, mock_config):
+    def test_create_generator_instances(self, make_loaded_manager, mock_translator, mock_config):
         """测试创建生成器实例"""
-        manager.generator_classes = [MockGenerator1, MockGenerator2, MockGenerator3]
-        manager._loaded = True
+        manager = make_loaded_manager([MockGenerator1, MockGenerator2, MockGenerator3])
 
         instances = manager.create_generator_instances(mock_translator, mock_config)
 
@@ -202,13 +244,12 @@ class TestCreateGeneratorInstances:
         for instance in instances:
             assert isinstance(instance, BaseSentenceGenerator)
 
-    def test_create_generator_instances_sorted_by_priority(self, manager, mock_translator, mock_config):
+    def test_create_generator_instances_sorted_by_priority(self, make_loaded_manager, mock_translator, mock_config):
         """测试生成器按优先级排序"""
         # MockGenerator1: priority=10
         # MockGenerator2: priority=5
         # MockGenerator3: priority=20
-        manager.generator_classes = [MockGenerator1, MockGenerator2, MockGenerator3]
-        manager._loaded = True
+        manager = make_loaded_manager([MockGenerator1, MockGenerator2, MockGenerator3])
 
         instances = manager.create_generator_instances(mock_translator, mock_config)
 
@@ -225,16 +266,15 @@ class TestCreateGeneratorInstances:
             manager.create_generator_instances(mock_translator, mock_config)
             mock_load.assert_called_once()
 
-    def test_create_generator_instances_empty(self, manager, mock_translator, mock_config):
+    def test_create_generator_instances_empty(self, make_loaded_manager, mock_translator, mock_config):
         """测试没有生成器类时"""
-        manager.generator_classes = []
-        manager._loaded = True
+        manager = make_loaded_manager()
 
         instances = manager.create_generator_instances(mock_translator, mock_config)
 
         assert instances == []
 
-    def test_create_generator_instances_with_error(self, manager, mock_translator, mock_config):
+    def test_create_generator_instances_with_error(self, make_loaded_manager, mock_translator, mock_config):
         """测试创建实例时出错"""
         # 创建一个会抛出异常的生成器类
         class BrokenGenerator(BaseSentenceGenerator):
@@ -248,8 +288,7 @@ class TestCreateGeneratorInstances:
             def process(self, data):
                 return []
 
-        manager.generator_classes = [MockGenerator1, BrokenGenerator, MockGenerator2]
-        manager._loaded = True
+        manager = make_loaded_manager([MockGenerator1, BrokenGenerator, MockGenerator2])
 
         instances = manager.create_generator_instances(mock_translator, mock_config)
 
@@ -258,14 +297,11 @@ class TestCreateGeneratorInstances:
         assert all(isinstance(i, BaseSentenceGenerator) for i in instances)
 
 
+@pytest.mark.slow
+@pytest.mark.xdist_group(name="discovery")
 class TestDiscoverGeneratorClasses:
     """测试发现生成器类"""
 
-    @pytest.fixture
-    def manager(self):
-        """创建管理器实例"""
-        return SentenceGeneratorManager("test_engine")
-
     def test_discover_generator_classes_manual_add(self, manager):
         """测试手动添加生成器类（模拟发现过程）"""
         # 直接测试发现后的结果，而不是 mock 整个发现过程
@@ -277,106 +313,80 @@ class TestDiscoverGeneratorClasses:
         assert MockGenerator1 in manager.generator_classes
         assert MockGenerator2 in manager.generator_classes
 
-    def test_discover_generator_classes_skip_packages(self, manager):
+    def test_discover_generator_classes_skip_packages(self, manager, monkeypatch):
         """测试跳过包（只处理模块）"""
-        mock_package = MagicMock()
-        mock_package.__path__ = []
-
-        with patch('importlib.import_module') as mock_import:
-            with patch('pkgutil.iter_modules') as mock_iter:
-                mock_import.return_value = mock_package
-                # is_pkg=True 表示是包，应该被跳过
-                mock_iter.return_value = [
-                    (None, "subpackage", True),
-                    (None, "not_generator", False)  # 不以 _generator 结尾
-                ]
+        monkeypatch.setattr(importlib, "import_module", lambda name: _FAKE_PACKAGE)
+        # is_pkg=True 表示是包，应该被跳过
+        monkeypatch.setattr(pkgutil, "iter_modules", lambda path: [
+            (None, "subpackage", True),
+            (None, "not_generator", False)  # 不以 _generator 结尾
+        ])
 
-                manager._discover_generator_classes()
+        manager._discover_generator_classes()
 
-                # 不应该发现任何生成器
-                assert manager.generator_classes == []
+        # 不应该发现任何生成器
+        assert manager.generator_classes == []
 
-    def test_discover_generator_classes_skip_non_generator_modules(self, manager):
+    def test_discover_generator_classes_skip_non_generator_modules(self, manager, monkeypatch):
         """测试跳过不以 _generator 结尾的模块"""
-        mock_package = MagicMock()
-        mock_package.__path__ = []
-
-        with patch('importlib.import_module') as mock_import:
-            with patch('pkgutil.iter_modules') as mock_iter:
-                mock_import.return_value = mock_package
-                mock_iter.return_value = [
-                    (None, "utils", False),
-                    (None, "helpers", False),
-                    (None, "__init__", False)
-                ]
+        monkeypatch.setattr(importlib, "import_module", lambda name: _FAKE_PACKAGE)
+        monkeypatch.setattr(pkgutil, "iter_modules", lambda path: [
+            (None, "utils", False),
+            (None, "helpers", False),
+            (None, "__init__", False)
+        ])
 
-                manager._discover_generator_classes()
+        manager._discover_generator_classes()
 
-                assert manager.generator_classes == []
+        assert manager.generator_classes == []
 
-    def test_discover_generator_classes_import_error(self, manager):
+    def test_discover_generator_classes_import_error(self, manager, monkeypatch):
         """测试导入包失败"""
-        with patch('importlib.import_module') as mock_import:
-            mock_import.side_effect = ImportError("Package not found")
+        def fail_import(name):
+            raise ImportError("Package not found")
 
-            with pytest.raises(GeneratorError, match="无法加载引擎 test_engine 的生成器"):
-                manager._discover_generator_classes()
+        monkeypatch.setattr(importlib, "import_module", fail_import)
 
-    def test_discover_generator_classes_module_import_error(self, manager):
+        with pytest.raises(GeneratorError, match="无法加载引擎 test_engine 的生成器"):
+            manager._discover_generator_classes()
+
+    def test_discover_generator_classes_module_import_error(self, manager, monkeypatch):
         """测试导入模块失败（应该记录错误但继续）"""
-        mock_package = MagicMock()
-        mock_package.__path__ = []
+        def fake_import(name):
+            # 包本身可以导入，其中的生成器模块导入失败
+            if name.endswith(".broken_generator"):
+                raise ImportError("Module not found")
+            return _FAKE_PACKAGE
 
-        with patch('importlib.import_module') as mock_import:
-            with patch('pkgutil.iter_modules') as mock_iter:
-                # 第一次调用返回包，第二次调用抛出异常
-                mock_import.side_effect = [
-                    mock_package,
-                    ImportError("Module not found")
-                ]
-                mock_iter.return_value = [
-                    (None, "broken_generator", False)
-                ]
+        monkeypatch.setattr(importlib, "import_module", fake_import)
+        monkeypatch.setattr(pkgutil, "iter_modules", lambda path: [
+            (None, "broken_generator", False)
+        ])
 
-                # 应该不抛出异常，只记录错误
-                manager._discover_generator_classes()
+        # 应该不抛出异常，只记录错误
+        manager._discover_generator_classes()
 
-                # 不应该发现任何生成器
-                assert manager.generator_classes == []
+        # 不应该发现任何生成器
+        assert manager.generator_classes == []
 
 
 class TestSentenceGeneratorManagerIntegration:
     """集成测试：测试完整的工作流程"""
 
-    @pytest.fixture
-    def manager(self):
-        """创建管理器实例"""
-        return SentenceGeneratorManager("test_engine")
-
-    @pytest.fixture
-    def mock_translator(self):
-        """创建模拟翻译器"""
-        return Mock(spec=ParamTranslator)
-
-    @pytest.fixture
-    def mock_config(self):
-        """创建模拟配置"""
-        return Mock(spec=EngineConfig)
-
-    def test_full_workflow(self, manager, mock_translator, mock_config):
+    def test_full_workflow(self, make_loaded_manager, mock_translator, mock_config,
+                           collected_param_configs):
         """测试完整工作流程"""
         # 模拟发现生成器
-        manager.generator_classes = [MockGenerator1, MockGenerator2, MockGenerator3]
-        manager._loaded = True
+        manager = make_loaded_manager([MockGenerator1, MockGenerator2, MockGenerator3])
 
-        # 1. 收集参数配置
-        manager._collect_param_configs()
-        assert len(manager.param_configs) == 4
+        # 1. 参数配置由会话级 fixture 收集，这里复制一份使用
+        assert len(collected_param_configs) == 4
+        manager.param_configs = dict(collected_param_configs)
 
         # 2. 获取所有参数名称
         param_names = manager.get_all_param_names()
         assert len(param_names) == 4
-        assert param_names == ["Background", "Character", "Music", "Sound"]
+        assert tuple(param_names) == _EXPECTED_PARAM_NAMES
 
         # 3. 创建生成器实例
         instances = manager.create_generator_instances(mock_translator, mock_config)
@@ -392,10 +402,9 @@ class TestSentenceGeneratorManagerIntegration:
             result = instance.process({"test": "data"})
             assert result is not None
 
-    def test_load_idempotent(self, manager):
+    def test_load_idempotent(self, make_loaded_manager):
         """测试 load 方法的幂等性"""
-        manager.generator_classes = [MockGenerator1]
-        manager._loaded = True
+        manager = make_loaded_manager([MockGenerator1])
 
         # 多次调用 load
         manager.load()
@@ -407,31 +416,8 @@ class TestSentenceGeneratorManagerIntegration:
 
     def test_param_configs_merge(self, manager):
         """测试参数配置合并"""
-        # 创建两个有重叠配置的生成器
-        class Generator1(BaseSentenceGenerator):
-            param_config = {"Music": {"format": "play {value}"}}
-
-            @property
-            def category(self):
-                return "gen1"
-
-            def process(self, data):
-                return []
-
-        class Generator2(BaseSentenceGenerator):
-            param_config = {
-                "Music": {"format": "music {value}"},  # 重复的键
-                "Sound": {"format": "sound {value}"}
-            }
-
-            @property
-            def category(self):
-                return "gen2"
-
-            def process(self, data):
-                return []
-
-        manager.generator_classes = [Generator1, Generator2]
+        # 两个生成器的配置有重叠的键
+        manager.generator_classes = [OverlapGenerator1, OverlapGenerator2]
         manager._collect_param_configs()
 
         # 后面的配置应该覆盖前面的
@@ -0,0 +1,80 @@
+"""
+测试工作表解析缓存
+"""
+import os
+
+from openpyxl import Workbook
+
+from core.excel_management import ExcelFileManager, load_sheets_cached
+
+
+def _write_workbook(path, value):
+    """写入只有一个单元格数据的工作簿"""
+    workbook = Workbook()
+    workbook.active.title = "第一章"
+    workbook.active.append(["Music"])
+    workbook.active.append([value])
+    workbook.save(path)
+
+
+class TestLoadSheetsCached:
+    """测试 load_sheets_cached 的解析缓存"""
+
+    def test_reuses_cache_until_file_changes(self, tmp_path, monkeypatch):
+        """测试文件未变化时从缓存加载，修改后重新解析"""
+        excel_file = tmp_path / "scenario.xlsx"
+        cache_dir = tmp_path / ".cache"
+        _write_workbook(excel_file, "bgm01")
+
+        first = load_sheets_cached(excel_file, ExcelFileManager(), cache_dir)
+        assert first["第一章"]["Music"].tolist() == ["bgm01"]
+        assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+        # 新的管理器没有内存缓存，命中磁盘缓存时不应再解析
+        def fail_on_load(self, file_path):
+            raise AssertionError("重新解析了未变化的文件")
+
+        monkeypatch.setattr(ExcelFileManager, "load_excel", fail_on_load)
+        cached = load_sheets_cached(excel_file, ExcelFileManager(), cache_dir)
+        assert cached["第一章"]["Music"].tolist() == ["bgm01"]
+        monkeypatch.undo()
+
+        _write_workbook(excel_file, "bgm02")
+        stat = excel_file.stat()
+        os.utime(excel_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        changed = load_sheets_cached(excel_file, ExcelFileManager(), cache_dir)
+        assert changed["第一章"]["Music"].tolist() == ["bgm02"]
+        # 同一文件只保留一份缓存
+        assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+    def test_read_engine_change_invalidates_cache(self, tmp_path, monkeypatch):
+        """测试换用其他读取引擎时不复用旧引擎解析的缓存"""
+        excel_file = tmp_path / "scenario.xlsx"
+        cache_dir = tmp_path / ".cache"
+        _write_workbook(excel_file, "bgm01")
+        load_sheets_cached(excel_file, ExcelFileManager(), cache_dir)
+
+        loads = []
+        load_excel = ExcelFileManager.load_excel
+
+        def counting_load(self, file_path):
+            loads.append(self.read_engine)
+            return load_excel(self, file_path)
+
+        monkeypatch.setattr(ExcelFileManager, "load_excel", counting_load)
+        sheets = load_sheets_cached(excel_file, ExcelFileManager(read_engine="openpyxl"), cache_dir)
+
+        assert loads == ["openpyxl"]
+        assert sheets["第一章"]["Music"].tolist() == ["bgm01"]
+        assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+    def test_without_cache_dir(self, tmp_path):
+        """测试不给缓存目录时直接读取，不写缓存"""
+        excel_file = tmp_path / "scenario.xlsx"
+        _write_workbook(excel_file, "bgm01")
+
+        sheets = load_sheets_cached(excel_file, ExcelFileManager(), None)
+
+        assert sheets["第一章"]["Music"].tolist() == ["bgm01"]
+        assert list(tmp_path.iterdir()) == [excel_file]
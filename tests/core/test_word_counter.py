@@ -2,11 +2,16 @@
 测试 word_counter 模块
 """
 import pytest
-import pandas as pd
-from unittest.mock import Mock, patch, MagicMock
 from core.word_counter import *
 from core.text_processor import *
 
+class _SpaceRemover(TextProcessor):
+    """去除空格的自定义文本处理器"""
+
+    def process(self, text: str) -> str:
+        return text.replace(" ", "")
+
+
 class TestBasicWordCounter:
     """
     测试 BasicWordCounter 类
@@ -14,82 +19,36 @@ class TestBasicWordCounter:
     统计字数时默认会使用 PunctuationFilter 过滤标点符号，可选传入自定义的文本处理器
     """
 
-    def test_count_empty_text(self):
-        """
-        测试 count 方法，输入为空文本列表
-        """
-        counter = BasicWordCounter()
-        text = []
-        result = counter.count(text)
-        assert result == 0
-
-    def test_count_empty_strings(self):
-        """
-        测试 count 方法，输入为只包含空字符串的列表
-        """
-        counter = BasicWordCounter()
-        text = ["", "", ""]
-        result = counter.count(text)
-        assert result == 0
-
-    def test_count_without_filter(self):
-        """
-        测试 count 方法，不使用文本处理器
-        """
-        counter = BasicWordCounter(filter=IdentityTextProcessor())
-        text = ["Hello, world!", "This is a test.", "你好！"]
-        result = counter.count(text)
-        assert result == 31  # 包含标点符号的字数
-
-    def test_count_with_punctuation_filter(self):
-        """
-        测试 count 方法，使用 PunctuationFilter 过滤标点符号
-        """
-        counter = BasicWordCounter()
-        text = ["Hello, world!", "This is a test.", "你好！"]
-        result = counter.count(text)
-        assert result == 23  # 不包含标点符号的字数
-
-    def test_count_with_chinese_extractor(self):
-        """
-        测试 count 方法，使用 RegexExtractor 提取中文字符
-        """
-        chinese_extractor = ChineseExtractor()
-        counter = BasicWordCounter(filter=chinese_extractor)
-        text = ["Hello, world!", "This is a test.", "你好，世界！"]
-        result = counter.count(text)
-        assert result == 4  # 只统计中文字符的字数
-
-    def test_count_with_custom_filter(self):
-        """
-        测试 count 方法，使用自定义文本处理器
-        """
-        class CustomFilter(TextProcessor):
-            def process(self, text: str) -> str:
-                return text.replace(" ", "")  # 去除空格
-
-        counter = BasicWordCounter(filter=CustomFilter())
-        text = ["Hello, world!", "This is a test.", "你好！"]
-        result = counter.count(text)
-        assert result == 27  # 去除空格后的字数
-
-    def test_count_with_none_and_nan(self):
-        """
-        测试 count 方法，输入包含 None 和 NaN 的列表
-        """
-        counter = BasicWordCounter()
-        text = ["Hello, world!", None, float('nan'), "This is a test."]
-        result = counter.count(text)
-        assert result == 21  # 只统计有效字符串的字数
-
-    def test_count_with_nonstrings_convert_to_strings(self):
-        """
-        测试 count 方法，输入包含非字符串类型的元素
-        """
-        counter = BasicWordCounter()
-        text = ["Hello, world!", 123, True, "This is a test."]
-        result = counter.count(text)
-        assert result == 28  # 转换为字符串后的字数
+    @pytest.mark.parametrize("factory, text, expected", [
+        # 空文本列表
+        (BasicWordCounter, [], 0),
+        # 只包含空字符串的列表
+        (BasicWordCounter, ["", "", ""], 0),
+        # 不使用文本处理器，包含标点符号的字数
+        (lambda: BasicWordCounter(filter=IdentityTextProcessor()),
+         ["Hello, world!", "This is a test.", "你好！"], 31),
+        # 默认使用 PunctuationFilter，不包含标点符号的字数
+        (BasicWordCounter, ["Hello, world!", "This is a test.", "你好！"], 23),
+        # 使用 ChineseExtractor，只统计中文字符的字数
+        (lambda: BasicWordCounter(filter=ChineseExtractor()),
+         ["Hello, world!", "This is a test.", "你好，世界！"], 4),
+        # 使用自定义文本处理器，去除空格后的字数
+        (lambda: BasicWordCounter(filter=_SpaceRemover()),
+         ["Hello, world!", "This is a test.", "你好！"], 27),
+        # 包含 None 和 NaN，只统计有效字符串的字数
+        (BasicWordCounter, ["Hello, world!", None, float('nan'), "This is a test."], 21),
+        # 包含非字符串元素，转换为字符串后的字数
+        (BasicWordCounter, ["Hello, world!", 123, True, "This is a test."], 28),
+    ], ids=[
+        "empty_text", "empty_strings", "without_filter", "punctuation_filter",
+        "chinese_extractor", "custom_filter", "none_and_nan", "nonstrings",
+    ])
+    def test_count(self, factory, text, expected):
+        """
+        测试 count 方法，覆盖不同输入和文本处理器的组合
+        """
+        counter = factory()
+        assert counter.count(text) == expected
 
     def test_count_with_nonstrings_cannot_convert(self):
         """
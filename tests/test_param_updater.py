@@ -1,104 +1,205 @@
 """
 测试 ParamUpdater 类
 """
+import functools
+import hashlib
+import os
+import re
+import shutil
+from types import SimpleNamespace
+
 import pytest
-import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.workbook.defined_name import DefinedName
 from pathlib import Path
-from unittest.mock import Mock, patch
+from core.excel_management import ExcelFileManager
+import update_param
 from update_param import ParamUpdater
-from core.config_manager import AppConfig
 
 
-class TestParamUpdater:
-    """测试 ParamUpdater 类"""
+# 测试用工作簿内容：工作表名 -> 行列表（第一行为表头）
+_PARAM_SHEETS = {
+    'Music': [('ExcelParam', 'ScenarioParam'),
+              ('音乐1', 'music1'), ('音乐2', 'music2'), ('背景音乐', 'bgm_main')],
+    'Speaker': [('ExcelParam', 'ScenarioParam'),
+                ('角色A', 'character_a'), ('角色B', 'character_b')],
+    'Background': [('ExcelParam', 'ScenarioParam'),
+                   ('背景1', 'bg_1'), ('背景2', 'bg_2')],
+    'Varient': [('ExcelParam', 'ScenarioParam'),
+                ('差分1', 'variant_1'), ('差分2', 'variant_2')],
+}
+
+_VARIENT_SHEETS = {
+    '角色A': [('ExcelParam', 'ScenarioParam'), ('开心', 'happy'), ('难过', 'sad')],
+    '角色B': [('ExcelParam', 'ScenarioParam'), ('生气', 'angry'), ('惊讶', 'surprised')],
+    # 模板工作表（应该被处理但可能是空的）
+    '参数表模板': [('ExcelParam', 'ScenarioParam')],
+}
+
+# _PARAM_SHEETS 的 Varient 表与 _VARIENT_SHEETS 各角色表合并后应包含的差分
+_EXPECTED_VARIENTS = frozenset({'差分1', '差分2', '开心', '难过', '生气', '惊讶'})
+
+_MUSIC_SHEETS = {
+    'Music': [('ExcelParam', 'ScenarioParam'), ('音乐1', 'music1'), ('音乐2', 'music2')],
+}
+
+_SINGLE_MUSIC_SHEETS = {
+    'Music': [('ExcelParam', 'ScenarioParam'), ('音乐1', 'music1')],
+}
+
+
+# 生成的映射文件必须包含的内容（每个前瞻断言对应一个关键字，一次扫描完成）
+_PARAM_MAPPINGS_RX = re.compile(
+    r'(?=.*PARAM_MAPPINGS)(?=.*Music)(?=.*Speaker)(?=.*music1)(?=.*character_a)', re.S
+)
+_VARIENT_MAPPINGS_RX = re.compile(r'(?=.*VARIENT_MAPPINGS)(?=.*角色A)(?=.*happy)', re.S)
+
+
+def _write_sheets(path, sheets):
+    """按工作表内容写出 Excel 文件（openpyxl 只写模式，不经过 DataFrame）"""
+    wb = Workbook(write_only=True)
+    for sheet_name, rows in sheets.items():
+        ws = wb.create_sheet(sheet_name)
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+
+
+def _make_config(tmp_path, create_dirs=True):
+    """
+    创建指向当前测试目录的最小配置
+
+    ParamUpdater 只读取 engine.engine_type 和 paths 下的两个目录，
+    用 SimpleNamespace 即可，不需要 Mock(spec=AppConfig)。
+
+    Args:
+        tmp_path: 当前测试的临时目录
+        create_dirs: 是否创建参数目录和输入目录
+
+    Returns:
+        SimpleNamespace: 配置对象
+    """
+    config = SimpleNamespace(
+        engine=SimpleNamespace(engine_type="renpy"),
+        paths=SimpleNamespace(
+            param_config_dir=tmp_path / "param_config",
+            input_dir=tmp_path / "input",
+        ),
+    )
+
+    if create_dirs:
+        # tmp_path 每个测试都是新建的空目录，直接创建子目录即可
+        config.paths.param_config_dir.mkdir()
+        config.paths.input_dir.mkdir()
+
+    return config
+
+
+@pytest.fixture
+def mock_config(tmp_path):
+    """创建模拟的配置对象"""
+    return _make_config(tmp_path)
+
+
+@pytest.fixture
+def updater(mock_config):
+    """创建 ParamUpdater 实例"""
+    return ParamUpdater(mock_config)
+
+
+@pytest.fixture
+def mock_config_nodirs(tmp_path):
+    """创建不建目录的模拟配置，用于在访问目录之前就返回的错误分支"""
+    return _make_config(tmp_path, create_dirs=False)
+
+
+@pytest.fixture
+def updater_nodirs(mock_config_nodirs):
+    """创建使用 mock_config_nodirs 的 ParamUpdater 实例"""
+    return ParamUpdater(mock_config_nodirs)
+
+
+@pytest.fixture(scope="session")
+def rendered_param_mapping():
+    """_MUSIC_SHEETS 对应的 param_mappings.py 标准内容"""
+    return (
+        "# 自动生成的参数映射文件\n"
+        "# 请不要手动编辑此文件\n"
+        "# 引擎类型: renpy\n"
+        "\n"
+        "PARAM_MAPPINGS = {\n"
+        "    'Music': {\n"
+        "        '音乐1': 'music1',\n"
+        "        '音乐2': 'music2',\n"
+        "    },\n"
+        "}\n"
+    )
 
-    @pytest.fixture
-    def mock_config(self, tmp_path):
-        """创建模拟的配置对象"""
-        config = Mock(spec=AppConfig)
-        config.engine = Mock()
-        config.engine.engine_type = "renpy"
-        config.paths = Mock()
-        config.paths.param_config_dir = tmp_path / "param_config"
-        config.paths.input_dir = tmp_path / "input"
 
-        # 创建必要的目录
-        config.paths.param_config_dir.mkdir(parents=True, exist_ok=True)
-        config.paths.input_dir.mkdir(parents=True, exist_ok=True)
+@pytest.fixture(scope="session")
+def bad_xlsx(tmp_path_factory):
+    """损坏的 Excel 文件（实际上是文本文件），会话内只写一次，测试只读取它"""
+    bad_file = tmp_path_factory.mktemp("bad") / "bad.xlsx"
+    bad_file.write_bytes(b"Not an Excel file")
+    return bad_file
 
-        return config
+
+@functools.lru_cache(maxsize=64)
+def _cached_load_impl(path_str, mtime_ns, size):
+    return load_workbook(path_str)
+
+
+def _cached_load(path):
+    """
+    读取用于校验的工作簿，文件未变化时复用上次的解析结果
+
+    缓存键包含修改时间和大小，文件被改写后会重新解析。
+    返回的工作簿是共享的，调用方只能读取。
+    """
+    st = os.stat(path)
+    return _cached_load_impl(str(path), st.st_mtime_ns, st.st_size)
+
+
+@pytest.fixture(scope="session")
+def xlsx_cache(tmp_path_factory):
+    """
+    会话级工作簿缓存
+
+    相同内容的工作簿只写一次，之后按内容哈希复制到目标路径。
+
+    Returns:
+        Callable: ``(sheets, dest) -> dest``
+    """
+    cache_dir = tmp_path_factory.mktemp("xlsx_cache")
+    built = {}
+
+    def _materialize(sheets, dest):
+        key = hashlib.sha1(repr(sheets).encode('utf-8')).hexdigest()
+        cached = built.get(key)
+        if cached is None:
+            cached = cache_dir / f"{key}.xlsx"
+            _write_sheets(cached, sheets)
+            built[key] = cached
+        shutil.copyfile(cached, dest)
+        return dest
+
+    return _materialize
+
+
+class TestParamUpdater:
+    """测试 ParamUpdater 类"""
 
     @pytest.fixture
-    def mock_param_excel(self, tmp_path):
+    def mock_param_excel(self, mock_config, xlsx_cache):
         """创建模拟的参数 Excel 文件"""
-        param_file = tmp_path / "param_config" / "param_data_renpy.xlsx"
-        param_file.parent.mkdir(parents=True, exist_ok=True)
-
-        # 创建多个工作表
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
-            # Music 工作表
-            df_music = pd.DataFrame({
-                'ExcelParam': ['音乐1', '音乐2', '背景音乐'],
-                'ScenarioParam': ['music1', 'music2', 'bgm_main']
-            })
-            df_music.to_excel(writer, sheet_name='Music', index=False)
-
-            # Speaker 工作表
-            df_speaker = pd.DataFrame({
-                'ExcelParam': ['角色A', '角色B'],
-                'ScenarioParam': ['character_a', 'character_b']
-            })
-            df_speaker.to_excel(writer, sheet_name='Speaker', index=False)
-
-            # Background 工作表
-            df_bg = pd.DataFrame({
-                'ExcelParam': ['背景1', '背景2'],
-                'ScenarioParam': ['bg_1', 'bg_2']
-            })
-            df_bg.to_excel(writer, sheet_name='Background', index=False)
-
-            # Varient 工作表
-            df_varient = pd.DataFrame({
-                'ExcelParam': ['差分1', '差分2'],
-                'ScenarioParam': ['variant_1', 'variant_2']
-            })
-            df_varient.to_excel(writer, sheet_name='Varient', index=False)
-
-        return param_file
+        param_file = mock_config.paths.param_config_dir / "param_data_renpy.xlsx"
+        return xlsx_cache(_PARAM_SHEETS, param_file)
 
     @pytest.fixture
-    def mock_varient_excel(self, tmp_path):
+    def mock_varient_excel(self, mock_config, xlsx_cache):
         """创建模拟的差分参数 Excel 文件"""
-        varient_file = tmp_path / "param_config" / "varient_data.xlsx"
-
-        with pd.ExcelWriter(varient_file, engine='openpyxl') as writer:
-            # 角色A 工作表
-            df_role_a = pd.DataFrame({
-                'ExcelParam': ['开心', '难过'],
-                'ScenarioParam': ['happy', 'sad']
-            })
-            df_role_a.to_excel(writer, sheet_name='角色A', index=False)
-
-            # 角色B 工作表
-            df_role_b = pd.DataFrame({
-                'ExcelParam': ['生气', '惊讶'],
-                'ScenarioParam': ['angry', 'surprised']
-            })
-            df_role_b.to_excel(writer, sheet_name='角色B', index=False)
-
-            # 模板工作表（应该被处理但可能是空的）
-            df_template = pd.DataFrame({
-                'ExcelParam': [],
-                'ScenarioParam': []
-            })
-            df_template.to_excel(writer, sheet_name='参数表模板', index=False)
-
-        return varient_file
-
-    @pytest.fixture
-    def updater(self, mock_config):
-        """创建 ParamUpdater 实例"""
-        return ParamUpdater(mock_config)
+        varient_file = mock_config.paths.param_config_dir / "varient_data.xlsx"
+        return xlsx_cache(_VARIENT_SHEETS, varient_file)
 
     def test_init(self, updater, mock_config):
         """测试初始化"""
@@ -120,6 +221,73 @@ class TestParamUpdater:
         assert mappings['Speaker']['角色A'] == 'character_a'
         assert mappings['Background']['背景1'] == 'bg_1'
 
+    def test_read_param_file_uses_disk_cache(self, updater, mock_param_excel, monkeypatch):
+        """测试再次读取未变化的文件时命中磁盘解析缓存"""
+        first = updater.read_param_file(mock_param_excel)
+
+        # 新实例没有内存缓存，只能从磁盘缓存读取
+        fresh = ParamUpdater(updater.config)
+
+        def fail_on_load(*args, **kwargs):
+            pytest.fail("磁盘缓存未命中，重新解析了 Excel 文件")
+
+        monkeypatch.setattr(fresh.excel_manager, "load_excel", fail_on_load)
+        assert fresh.read_param_file(mock_param_excel) == first
+
+    def test_load_sheets_reuses_sheets_within_run(self, updater, mock_param_excel, monkeypatch):
+        """测试同一次运行中再次读取同一文件时不再访问磁盘缓存"""
+        first = updater._load_sheets(mock_param_excel)
+
+        def fail_on_load(*args, **kwargs):
+            pytest.fail("重复读取了磁盘缓存")
+
+        monkeypatch.setattr(update_param, "load_sheets_cached", fail_on_load)
+        assert updater._load_sheets(mock_param_excel) is first
+
+    def test_disk_cache_keeps_one_entry_per_file(self, mock_config, mock_param_excel):
+        """测试文件内容变化后替换原有缓存，而不是留下旧缓存"""
+        ParamUpdater(mock_config)._load_sheets(mock_param_excel)
+
+        _write_sheets(mock_param_excel, {'Music': [('ExcelParam', 'ScenarioParam'), ('音乐3', 'music3')]})
+        ParamUpdater(mock_config)._load_sheets(mock_param_excel)
+
+        cache_files = list((mock_config.paths.param_config_dir / ".cache").glob("*.pkl"))
+        assert len(cache_files) == 1
+
+    def test_read_param_file_without_disk_cache(self, mock_config, mock_param_excel):
+        """测试关闭磁盘缓存时不写缓存文件"""
+        updater = ParamUpdater(mock_config, use_disk_cache=False)
+        mappings = updater.read_param_file(mock_param_excel)
+
+        assert 'Music' in mappings
+        assert not (mock_config.paths.param_config_dir / ".cache").exists()
+
+    def test_read_param_file_shared_excel_manager(self, mock_config, mock_param_excel):
+        """测试注入的 ExcelFileManager 与调用方共用内存缓存"""
+        manager = ExcelFileManager(cache_enabled=True)
+        sheets = manager.load_excel(mock_param_excel)
+
+        updater = ParamUpdater(mock_config, use_disk_cache=False, excel_manager=manager)
+        assert updater.excel_manager is manager
+        assert updater._load_sheets(mock_param_excel) is sheets
+
+    def test_get_all_validate_params_is_cached(self, updater, monkeypatch):
+        """测试生成器参数类型只扫描一次"""
+        created = []
+
+        class FakeManager:
+            def __init__(self, engine_type):
+                created.append(engine_type)
+
+            def get_validate_params(self):
+                return {'translate_types': ['Music'], 'validate_types': []}
+
+        monkeypatch.setattr(update_param, "SentenceGeneratorManager", FakeManager)
+
+        first = updater.get_all_validate_params()
+        assert updater.get_all_validate_params() is first
+        assert created == ['renpy']
+
     def test_read_param_file_not_exist(self, updater, tmp_path):
         """测试读取不存在的文件"""
         non_existent = tmp_path / "nonexistent.xlsx"
@@ -127,46 +295,31 @@ class TestParamUpdater:
 
         assert mappings == {}
 
-    def test_read_param_file_skip_template(self, updater, tmp_path):
+    @pytest.mark.parametrize("skip_template, template_included", [
+        (True, False),   # skip_template=True 时应该跳过模板
+        (False, True),   # skip_template=False 时应该包含模板
+    ], ids=["skip", "keep"])
+    def test_read_param_file_skip_template(
+        self, updater, tmp_path, xlsx_cache, skip_template, template_included
+    ):
         """测试跳过模板工作表"""
-        param_file = tmp_path / "test_param.xlsx"
-
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
+        param_file = xlsx_cache({
             # 正常工作表
-            df_normal = pd.DataFrame({
-                'ExcelParam': ['参数1'],
-                'ScenarioParam': ['param1']
-            })
-            df_normal.to_excel(writer, sheet_name='Normal', index=False)
-
+            'Normal': [('ExcelParam', 'ScenarioParam'), ('参数1', 'param1')],
             # 模板工作表
-            df_template = pd.DataFrame({
-                'ExcelParam': ['模板参数'],
-                'ScenarioParam': ['template_param']
-            })
-            df_template.to_excel(writer, sheet_name='参数表模板', index=False)
-
-        # skip_template=True 时应该跳过模板
-        mappings = updater.read_param_file(param_file, skip_template=True)
-        assert 'Normal' in mappings
-        assert '参数表模板' not in mappings
+            '参数表模板': [('ExcelParam', 'ScenarioParam'), ('模板参数', 'template_param')],
+        }, tmp_path / "test_param.xlsx")
 
-        # skip_template=False 时应该包含模板
-        mappings = updater.read_param_file(param_file, skip_template=False)
+        mappings = updater.read_param_file(param_file, skip_template=skip_template)
         assert 'Normal' in mappings
-        assert '参数表模板' in mappings
+        assert ('参数表模板' in mappings) is template_included
 
-    def test_read_param_file_missing_columns(self, updater, tmp_path):
+    def test_read_param_file_missing_columns(self, updater, tmp_path, xlsx_cache):
         """测试缺少必需列的工作表"""
-        param_file = tmp_path / "test_param.xlsx"
-
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
+        param_file = xlsx_cache({
             # 缺少 ScenarioParam 列
-            df_missing = pd.DataFrame({
-                'ExcelParam': ['参数1'],
-                'WrongColumn': ['wrong']
-            })
-            df_missing.to_excel(writer, sheet_name='MissingColumn', index=False)
+            'MissingColumn': [('ExcelParam', 'WrongColumn'), ('参数1', 'wrong')],
+        }, tmp_path / "test_param.xlsx")
 
         mappings = updater.read_param_file(param_file)
 
@@ -196,20 +349,14 @@ class TestParamUpdater:
         # 验证差分参数被合并到 Varient 列
         assert 'Varient' in validation_data
 
-        # 应该包含基础差分参数
-        assert '差分1' in validation_data['Varient']
-        assert '差分2' in validation_data['Varient']
-
-        # 应该包含角色特定的差分参数
-        assert '开心' in validation_data['Varient']
-        assert '难过' in validation_data['Varient']
-        assert '生气' in validation_data['Varient']
-        assert '惊讶' in validation_data['Varient']
+        # 应该包含基础差分参数和角色特定的差分参数
+        varient_list = validation_data['Varient']
+        varient_set = set(varient_list)
+        assert _EXPECTED_VARIENTS <= varient_set
 
         # 验证去重和排序
-        varient_list = validation_data['Varient']
-        assert len(varient_list) == len(set(varient_list))  # 无重复
-        assert varient_list == sorted(varient_list)  # 已排序
+        assert len(varient_list) == len(varient_set)  # 无重复
+        assert varient_list == sorted(varient_set)  # 已排序
 
     def test_collect_validation_data_file_not_exist(self, updater, tmp_path):
         """测试文件不存在时的行为"""
@@ -218,16 +365,21 @@ class TestParamUpdater:
 
         assert validation_data == {}
 
-    def test_collect_validation_data_empty_values(self, updater, tmp_path):
+    def test_collect_validation_data_empty_values(self, updater, tmp_path, xlsx_cache):
         """测试处理空值和空字符串"""
-        param_file = tmp_path / "test_param.xlsx"
-
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
-            df = pd.DataFrame({
-                'ExcelParam': ['参数1', '', None, '  ', '参数2'],
-                'ScenarioParam': ['param1', 'empty', 'none', 'spaces', 'param2']
-            })
-            df.to_excel(writer, sheet_name='Test', index=False)
+        param_file = xlsx_cache({
+            'Test': [('ExcelParam', 'ScenarioParam'),
+                     ('参数1', 'param1'), (None, 'empty'), (None, 'none'),
+                     ('  ', 'spaces'), ('参数2', 'param2')],
+        }, tmp_path / "test_param.xlsx")
+
+        # 空单元格以真正的空值写入，纯空格保留原样
+        wb = load_workbook(param_file, read_only=True)
+        try:
+            cells = [r[0] for r in wb['Test'].iter_rows(min_row=2, max_col=1, values_only=True)]
+        finally:
+            wb.close()
+        assert cells == ['参数1', None, None, '  ', '参数2']
 
         validation_data = updater.collect_validation_data(param_file)
 
@@ -253,11 +405,7 @@ class TestParamUpdater:
 
         # 验证文件内容
         content = output_file.read_text(encoding='utf-8')
-        assert 'PARAM_MAPPINGS' in content
-        assert 'Music' in content
-        assert 'Speaker' in content
-        assert 'music1' in content
-        assert 'character_a' in content
+        assert _PARAM_MAPPINGS_RX.search(content), content
 
     def test_generate_mappings_file_varient(self, updater, tmp_path):
         """测试生成差分映射文件"""
@@ -274,21 +422,19 @@ class TestParamUpdater:
 
         # 验证文件内容
         content = output_file.read_text(encoding='utf-8')
-        assert 'VARIENT_MAPPINGS' in content
-        assert '角色A' in content
-        assert 'happy' in content
+        assert _VARIENT_MAPPINGS_RX.search(content), content
 
-    def test_update_scenario_param_sheets_no_validation_data(self, updater):
+    def test_update_scenario_param_sheets_no_validation_data(self, updater_nodirs):
         """测试没有验证数据时的行为"""
-        result = updater.update_scenario_param_sheets({})
+        result = updater_nodirs.update_scenario_param_sheets({})
         assert result is False
 
-    def test_update_scenario_param_sheets_input_dir_not_exist(self, updater, tmp_path):
+    def test_update_scenario_param_sheets_input_dir_not_exist(self, updater_nodirs):
         """测试输入目录不存在时的行为"""
-        updater.config.paths.input_dir = tmp_path / "nonexistent"
+        assert not updater_nodirs.config.paths.input_dir.exists()
         validation_data = {'Music': ['音乐1']}
 
-        result = updater.update_scenario_param_sheets(validation_data)
+        result = updater_nodirs.update_scenario_param_sheets(validation_data)
         assert result is False
 
     def test_update_scenario_param_sheets_no_excel_files(self, updater):
@@ -301,8 +447,6 @@ class TestParamUpdater:
 
     def test_update_scenario_param_sheets_with_param_sheet(self, updater):
         """测试更新包含参数表的 Excel 文件"""
-        from openpyxl import Workbook
-
         # 创建一个包含"参数表"的 Excel 文件
         excel_file = updater.config.paths.input_dir / "test_scenario.xlsx"
 
@@ -333,31 +477,21 @@ class TestParamUpdater:
         assert result is True
 
         # 验证文件已更新
-        from openpyxl import load_workbook
-        wb = load_workbook(excel_file)
+        wb = _cached_load(excel_file)
         ws = wb['参数表']
 
         # 验证 Music 列已更新
-        music_values = []
-        for row in range(2, ws.max_row + 1):
-            value = ws.cell(row=row, column=1).value
-            if value:
-                music_values.append(value)
+        music_values = [r[0] for r in ws.iter_rows(min_row=2, max_col=1, values_only=True) if r[0]]
 
         assert len(music_values) == 3
         assert '音乐1' in music_values
         assert '音乐3' in music_values
 
-        wb.close()
-
-    def test_update_scenario_param_sheets_without_param_sheet(self, updater):
+    def test_update_scenario_param_sheets_without_param_sheet(self, updater, xlsx_cache):
         """测试处理没有参数表的 Excel 文件"""
         # 创建一个没有"参数表"的 Excel 文件
-        excel_file = updater.config.paths.input_dir / "no_param_sheet.xlsx"
-
-        with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
-            df = pd.DataFrame({'Data': [1, 2, 3]})
-            df.to_excel(writer, sheet_name='Sheet1', index=False)
+        xlsx_cache({'Sheet1': [('Data',), (1,), (2,), (3,)]},
+                   updater.config.paths.input_dir / "no_param_sheet.xlsx")
 
         validation_data = {'Music': ['音乐1']}
 
@@ -367,8 +501,6 @@ class TestParamUpdater:
 
     def test_update_scenario_param_sheets_skip_temp_files(self, updater):
         """测试跳过临时文件（以 ~ 开头）"""
-        from openpyxl import Workbook
-
         # 创建临时文件
         temp_file = updater.config.paths.input_dir / "~temp.xlsx"
 
@@ -387,8 +519,6 @@ class TestParamUpdater:
 
     def test_update_scenario_param_sheets_no_changes_needed(self, updater):
         """测试当参数表已经是最新时的行为"""
-        from openpyxl import Workbook
-
         # 创建一个已经包含正确数据的 Excel 文件
         excel_file = updater.config.paths.input_dir / "up_to_date.xlsx"
 
@@ -420,8 +550,6 @@ class TestParamUpdater:
 
     def test_update_scenario_param_sheets_with_named_ranges(self, updater):
         """测试创建命名区域"""
-        from openpyxl import Workbook, load_workbook
-
         # 创建 Excel 文件
         excel_file = updater.config.paths.input_dir / "with_ranges.xlsx"
 
@@ -446,7 +574,7 @@ class TestParamUpdater:
         assert result is True
 
         # 验证命名区域已创建
-        wb = load_workbook(excel_file)
+        wb = _cached_load(excel_file)
 
         # 检查 MusicList 命名区域
         assert 'MusicList' in wb.defined_names
@@ -457,24 +585,23 @@ class TestParamUpdater:
         # 检查 SpeakerList 命名区域
         assert 'SpeakerList' in wb.defined_names
 
-        wb.close()
-
     def test_update_scenario_param_sheets_multiple_files(self, updater):
         """测试同时处理多个 Excel 文件"""
-        from openpyxl import Workbook, load_workbook
+        # 创建多个内容相同的 Excel 文件：只序列化一次，其余直接复制
+        input_dir = updater.config.paths.input_dir
+        first = input_dir / "scenario_0.xlsx"
 
-        # 创建多个 Excel 文件
-        for i in range(3):
-            excel_file = updater.config.paths.input_dir / f"scenario_{i}.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "参数表"
+        ws['A1'] = 'Music'
+        ws['A2'] = '旧音乐'
 
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "参数表"
-            ws['A1'] = 'Music'
-            ws['A2'] = '旧音乐'
+        wb.save(first)
+        wb.close()
 
-            wb.save(excel_file)
-            wb.close()
+        for i in (1, 2):
+            shutil.copyfile(first, input_dir / f"scenario_{i}.xlsx")
 
         validation_data = {
             'Music': ['音乐1', '音乐2']
@@ -487,51 +614,79 @@ class TestParamUpdater:
         # 验证所有文件都已更新
         for i in range(3):
             excel_file = updater.config.paths.input_dir / f"scenario_{i}.xlsx"
-            wb = load_workbook(excel_file)
+            wb = _cached_load(excel_file)
             ws = wb['参数表']
 
             # 验证数据已更新
-            music_col_values = []
-            for row in range(2, ws.max_row + 1):
-                value = ws.cell(row=row, column=1).value
-                if value:
-                    music_col_values.append(value)
+            music_col_values = [
+                r[0] for r in ws.iter_rows(min_row=2, max_col=1, values_only=True) if r[0]
+            ]
 
             assert len(music_col_values) == 2
             assert '音乐1' in music_col_values
+
+    def test_update_scenario_param_sheets_parallel_jobs(self, mock_config):
+        """测试多进程并行更新多个 Excel 文件"""
+        updater = ParamUpdater(mock_config, jobs=2)
+        input_dir = updater.config.paths.input_dir
+        for i in range(2):
+            wb = Workbook()
+            wb.active.title = "参数表"
+            wb.save(input_dir / f"scenario_{i}.xlsx")
             wb.close()
 
+        result = updater.update_scenario_param_sheets({'Music': ['音乐1', '音乐2']})
+        assert result is True
+
+        for i in range(2):
+            ws = load_workbook(input_dir / f"scenario_{i}.xlsx")['参数表']
+            headers = [cell.value for cell in ws[1]]
+            col = headers.index('Music') + 1
+            values = [r[0] for r in ws.iter_rows(min_row=2, min_col=col, max_col=col, values_only=True) if r[0]]
+            assert values == ['音乐1', '音乐2']
+
+    def test_update_scenario_param_sheets_skips_unchanged_files(self, updater, monkeypatch):
+        """测试参数数据和文件都未变化时不再打开文件"""
+        scenario_file = updater.config.paths.input_dir / "scenario.xlsx"
+        wb = Workbook()
+        wb.active.title = "参数表"
+        wb.save(scenario_file)
+        wb.close()
+
+        validation_data = {'Music': ['音乐1']}
+        assert updater.update_scenario_param_sheets(validation_data) is True
+
+        processed = []
+
+        def record_update(excel_file, parameter_data):
+            processed.append(excel_file.name)
+            return True
+
+        monkeypatch.setattr(update_param, "_update_param_sheet_file", record_update)
+
+        assert updater.update_scenario_param_sheets(validation_data) is True
+        assert processed == []
+
+        # 参数数据变化后重新处理
+        assert updater.update_scenario_param_sheets({'Music': ['音乐1', '音乐2']}) is True
+        assert processed == ['scenario.xlsx']
+
 
 class TestParamUpdaterIntegration:
     """集成测试：测试完整的参数更新流程"""
 
     @pytest.fixture
-    def full_setup(self, tmp_path):
+    def full_setup(self, tmp_path, xlsx_cache):
         """创建完整的测试环境"""
-        # 创建配置
-        config = Mock(spec=AppConfig)
-        config.engine = Mock()
-        config.engine.engine_type = "renpy"
-        config.paths = Mock()
-        config.paths.param_config_dir = tmp_path / "param_config"
-        config.paths.input_dir = tmp_path / "input"
-
-        # 创建目录
-        config.paths.param_config_dir.mkdir(parents=True)
-        config.paths.input_dir.mkdir(parents=True)
+        # 创建配置和目录
+        config = _make_config(tmp_path)
 
         # 创建参数文件
-        param_file = config.paths.param_config_dir / "param_data_renpy.xlsx"
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
-            df_music = pd.DataFrame({
-                'ExcelParam': ['音乐1', '音乐2'],
-                'ScenarioParam': ['music1', 'music2']
-            })
-            df_music.to_excel(writer, sheet_name='Music', index=False)
+        param_file = xlsx_cache(_MUSIC_SHEETS, config.paths.param_config_dir / "param_data_renpy.xlsx")
 
         return config, param_file
 
-    def test_full_workflow(self, full_setup):
+    def test_full_workflow(self, full_setup, rendered_param_mapping):
         """测试完整的工作流程"""
         config, param_file = full_setup
         updater = ParamUpdater(config)
@@ -543,7 +698,7 @@ class TestParamUpdaterIntegration:
         # 2. 生成映射文件
         output_file = config.paths.param_config_dir / "param_mappings.py"
         updater.generate_mappings_file(mappings, output_file)
-        assert output_file.exists()
+        assert output_file.read_text(encoding='utf-8') == rendered_param_mapping
 
         # 3. 收集验证数据
         validation_data = updater.collect_validation_data(param_file)
@@ -554,31 +709,9 @@ class TestParamUpdaterIntegration:
 class TestExceptionHandling:
     """测试异常处理"""
 
-    @pytest.fixture
-    def mock_config(self, tmp_path):
-        """创建模拟配置"""
-        config = Mock(spec=AppConfig)
-        config.engine = Mock()
-        config.engine.engine_type = "renpy"
-        config.paths = Mock()
-        config.paths.param_config_dir = tmp_path / "param_config"
-        config.paths.input_dir = tmp_path / "input"
-        config.paths.param_config_dir.mkdir(parents=True, exist_ok=True)
-        config.paths.input_dir.mkdir(parents=True, exist_ok=True)
-        return config
-
-    @pytest.fixture
-    def updater(self, mock_config):
-        """创建更新器实例"""
-        return ParamUpdater(mock_config)
-
-    def test_read_param_file_with_exception(self, updater, tmp_path):
+    def test_read_param_file_with_exception(self, updater, bad_xlsx):
         """测试读取参数文件时发生异常"""
-        # 创建一个损坏的 Excel 文件（实际上是文本文件）
-        bad_file = tmp_path / "bad.xlsx"
-        bad_file.write_text("This is not an Excel file")
-
-        result = updater.read_param_file(bad_file)
+        result = updater.read_param_file(bad_xlsx)
 
         # 应该返回空字典
         assert result == {}
@@ -597,34 +730,21 @@ class TestExceptionHandling:
         # 文件不应该被创建
         assert not output_file.exists()
 
-    def test_collect_validation_data_with_read_error(self, updater, tmp_path):
+    def test_collect_validation_data_with_read_error(self, updater, bad_xlsx):
         """测试收集验证数据时读取失败"""
-        # 创建一个损坏的文件
-        bad_file = tmp_path / "bad.xlsx"
-        bad_file.write_text("Not an Excel file")
-
-        result = updater.collect_validation_data(bad_file)
+        result = updater.collect_validation_data(bad_xlsx)
 
         # 应该返回空字典
         assert result == {}
 
-    def test_collect_validation_data_with_varient_read_error(self, updater, tmp_path):
+    def test_collect_validation_data_with_varient_read_error(self, updater, tmp_path, xlsx_cache,
+                                                             bad_xlsx):
         """测试收集验证数据时差分文件读取失败"""
         # 创建正常的参数文件
-        param_file = tmp_path / "param.xlsx"
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
-            df = pd.DataFrame({
-                'ExcelParam': ['音乐1'],
-                'ScenarioParam': ['music1']
-            })
-            df.to_excel(writer, sheet_name='Music', index=False)
-
-        # 创建损坏的差分文件
-        varient_file = tmp_path / "varient.xlsx"
-        varient_file.write_text("Not an Excel file")
+        param_file = xlsx_cache(_SINGLE_MUSIC_SHEETS, tmp_path / "param.xlsx")
 
         # 应该只返回基础参数，忽略差分文件错误
-        result = updater.collect_validation_data(param_file, varient_file)
+        result = updater.collect_validation_data(param_file, bad_xlsx)
 
         assert 'Music' in result
         assert '音乐1' in result['Music']
@@ -633,70 +753,39 @@ class TestExceptionHandling:
 class TestUpdateMappingsMethod:
     """测试 update_mappings 方法"""
 
-    @pytest.fixture
-    def mock_config(self, tmp_path):
-        """创建模拟配置"""
-        config = Mock(spec=AppConfig)
-        config.engine = Mock()
-        config.engine.engine_type = "renpy"
-        config.paths = Mock()
-        config.paths.param_config_dir = tmp_path / "param_config"
-        config.paths.input_dir = tmp_path / "input"
-        config.paths.param_config_dir.mkdir(parents=True, exist_ok=True)
-        config.paths.input_dir.mkdir(parents=True, exist_ok=True)
-        return config
-
-    @pytest.fixture
-    def updater(self, mock_config):
-        """创建更新器实例"""
-        return ParamUpdater(mock_config)
-
-    def test_update_mappings_param_file_not_exist(self, updater):
+    def test_update_mappings_param_file_not_exist(self, updater_nodirs):
         """测试参数文件不存在时的行为"""
-        result = updater.update_mappings()
+        result = updater_nodirs.update_mappings()
 
         # 应该返回 False
         assert result is False
 
-    def test_update_mappings_success_without_varient(self, updater, tmp_path):
+    def test_update_mappings_success_without_varient(self, updater, tmp_path, xlsx_cache,
+                                                     rendered_param_mapping):
         """测试成功更新映射（没有差分文件）"""
         # 创建参数文件
-        param_file = updater.config.paths.param_config_dir / "param_data_renpy.xlsx"
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
-            df = pd.DataFrame({
-                'ExcelParam': ['音乐1', '音乐2'],
-                'ScenarioParam': ['music1', 'music2']
-            })
-            df.to_excel(writer, sheet_name='Music', index=False)
+        xlsx_cache(_MUSIC_SHEETS, updater.config.paths.param_config_dir / "param_data_renpy.xlsx")
 
         result = updater.update_mappings()
 
         # 应该成功
         assert result is True
 
-        # 验证映射文件已创建
+        # 验证映射文件已创建且内容正确
         mapping_file = updater.config.paths.param_config_dir / "param_mappings.py"
-        assert mapping_file.exists()
+        assert mapping_file.read_text(encoding='utf-8') == rendered_param_mapping
 
-    def test_update_mappings_success_with_varient(self, updater, tmp_path):
+    def test_update_mappings_success_with_varient(self, updater, tmp_path, xlsx_cache):
         """测试成功更新映射（有差分文件）"""
+        param_config_dir = updater.config.paths.param_config_dir
+
         # 创建参数文件
-        param_file = updater.config.paths.param_config_dir / "param_data_renpy.xlsx"
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
-            df = pd.DataFrame({
-                'ExcelParam': ['音乐1'],
-                'ScenarioParam': ['music1']
-            })
-            df.to_excel(writer, sheet_name='Music', index=False)
+        xlsx_cache(_SINGLE_MUSIC_SHEETS, param_config_dir / "param_data_renpy.xlsx")
 
         # 创建差分文件
-        varient_file = updater.config.paths.param_config_dir / "varient_data.xlsx"
-        with pd.ExcelWriter(varient_file, engine='openpyxl') as writer:
-            df = pd.DataFrame({
-                'ExcelParam': ['开心', '难过'],
-                'ScenarioParam': ['happy', 'sad']
-            })
-            df.to_excel(writer, sheet_name='角色A', index=False)
+        xlsx_cache({
+            '角色A': [('ExcelParam', 'ScenarioParam'), ('开心', 'happy'), ('难过', 'sad')],
+        }, param_config_dir / "varient_data.xlsx")
 
         result = updater.update_mappings()
 
@@ -709,31 +798,49 @@ class TestUpdateMappingsMethod:
         assert mapping_file.exists()
         assert varient_mapping_file.exists()
 
-    def test_update_mappings_empty_mappings(self, updater, tmp_path):
+    def test_update_mappings_skips_unchanged_varient(self, updater, xlsx_cache, monkeypatch):
+        """测试差分参数文件未变化时不重新生成差分映射"""
+        param_config_dir = updater.config.paths.param_config_dir
+        xlsx_cache(_SINGLE_MUSIC_SHEETS, param_config_dir / "param_data_renpy.xlsx")
+        xlsx_cache({
+            '角色A': [('ExcelParam', 'ScenarioParam'), ('开心', 'happy')],
+        }, param_config_dir / "varient_data.xlsx")
+
+        assert updater.update_mappings() is True
+        assert (param_config_dir / "varient_mappings.hash").exists()
+
+        generated = []
+        original = updater.generate_mappings_file
+
+        def record_generate(mappings, output_file):
+            generated.append(output_file.name)
+            return original(mappings, output_file)
+
+        monkeypatch.setattr(updater, "generate_mappings_file", record_generate)
+        assert updater.update_mappings() is True
+        assert generated == ["param_mappings.py"]
+
+        # 关闭缓存时总是重新生成
+        updater.use_disk_cache = False
+        generated.clear()
+        assert updater.update_mappings() is True
+        assert generated == ["param_mappings.py", "varient_mappings.py"]
+
+    def test_update_mappings_empty_mappings(self, updater, tmp_path, xlsx_cache):
         """测试参数文件为空时的行为"""
         # 创建一个空的参数文件
-        param_file = updater.config.paths.param_config_dir / "param_data_renpy.xlsx"
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
-            df = pd.DataFrame({'A': []})
-            df.to_excel(writer, sheet_name='Sheet1', index=False)
+        xlsx_cache({'Sheet1': [('A',)]},
+                   updater.config.paths.param_config_dir / "param_data_renpy.xlsx")
 
         result = updater.update_mappings()
 
         # 应该返回 False（没有读取到映射）
         assert result is False
 
-    def test_update_mappings_with_scenario_param_sheets(self, updater, tmp_path):
+    def test_update_mappings_with_scenario_param_sheets(self, updater, tmp_path, xlsx_cache):
         """测试更新映射并更新演出表格"""
-        from openpyxl import Workbook
-
         # 创建参数文件
-        param_file = updater.config.paths.param_config_dir / "param_data_renpy.xlsx"
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
-            df = pd.DataFrame({
-                'ExcelParam': ['音乐1', '音乐2'],
-                'ScenarioParam': ['music1', 'music2']
-            })
-            df.to_excel(writer, sheet_name='Music', index=False)
+        xlsx_cache(_MUSIC_SHEETS, updater.config.paths.param_config_dir / "param_data_renpy.xlsx")
 
         # 创建演出表格文件
         scenario_file = updater.config.paths.input_dir / "scenario.xlsx"
@@ -753,29 +860,8 @@ class TestUpdateMappingsMethod:
 class TestEdgeCases:
     """测试边界情况"""
 
-    @pytest.fixture
-    def mock_config(self, tmp_path):
-        """创建模拟配置"""
-        config = Mock(spec=AppConfig)
-        config.engine = Mock()
-        config.engine.engine_type = "renpy"
-        config.paths = Mock()
-        config.paths.param_config_dir = tmp_path / "param_config"
-        config.paths.input_dir = tmp_path / "input"
-        config.paths.param_config_dir.mkdir(parents=True, exist_ok=True)
-        config.paths.input_dir.mkdir(parents=True, exist_ok=True)
-        return config
-
-    @pytest.fixture
-    def updater(self, mock_config):
-        """创建更新器实例"""
-        return ParamUpdater(mock_config)
-
     def test_update_scenario_param_sheets_named_range_already_correct(self, updater):
         """测试命名区域已经正确时不更新"""
-        from openpyxl import Workbook
-        from openpyxl.workbook.defined_name import DefinedName
-
         # 创建 Excel 文件
         excel_file = updater.config.paths.input_dir / "test.xlsx"
         wb = Workbook()
@@ -802,31 +888,19 @@ class TestEdgeCases:
         # 应该返回 False（没有更新）
         assert result is False
 
-    def test_collect_validation_data_merge_varient(self, updater, tmp_path):
+    def test_collect_validation_data_merge_varient(self, updater, tmp_path, xlsx_cache):
         """测试合并差分参数到 Varient 列"""
         # 创建基础参数文件（包含 Varient）
-        param_file = tmp_path / "param.xlsx"
-        with pd.ExcelWriter(param_file, engine='openpyxl') as writer:
-            df_music = pd.DataFrame({
-                'ExcelParam': ['音乐1'],
-                'ScenarioParam': ['music1']
-            })
-            df_music.to_excel(writer, sheet_name='Music', index=False)
-
-            df_varient = pd.DataFrame({
-                'ExcelParam': ['差分A', '差分B'],
-                'ScenarioParam': ['var_a', 'var_b']
-            })
-            df_varient.to_excel(writer, sheet_name='Varient', index=False)
+        param_file = xlsx_cache({
+            'Music': [('ExcelParam', 'ScenarioParam'), ('音乐1', 'music1')],
+            'Varient': [('ExcelParam', 'ScenarioParam'), ('差分A', 'var_a'), ('差分B', 'var_b')],
+        }, tmp_path / "param.xlsx")
 
         # 创建差分文件
-        varient_file = tmp_path / "varient.xlsx"
-        with pd.ExcelWriter(varient_file, engine='openpyxl') as writer:
-            df = pd.DataFrame({
-                'ExcelParam': ['差分C', '差分A'],  # 差分A 重复
-                'ScenarioParam': ['var_c', 'var_a']
-            })
-            df.to_excel(writer, sheet_name='角色A', index=False)
+        varient_file = xlsx_cache({
+            # 差分A 重复
+            '角色A': [('ExcelParam', 'ScenarioParam'), ('差分C', 'var_c'), ('差分A', 'var_a')],
+        }, tmp_path / "varient.xlsx")
 
         result = updater.collect_validation_data(param_file, varient_file)
 
@@ -839,30 +913,44 @@ class TestEdgeCases:
         # 应该去重，所以只有 3 个
         assert len(varient_list) == 3
 
-    def test_generate_mappings_file_varient_variable_name(self, updater, tmp_path):
-        """测试生成差分映射文件时使用正确的变量名"""
-        mappings = {'角色A': {'开心': 'happy'}}
-        output_file = tmp_path / "varient_mappings.py"
+    @pytest.mark.parametrize("file_name, mappings, expected_var, forbidden_var", [
+        ("varient_mappings.py", {'角色A': {'开心': 'happy'}}, 'VARIENT_MAPPINGS', 'PARAM_MAPPINGS'),
+        ("param_mappings.py", {'Music': {'音乐1': 'music1'}}, 'PARAM_MAPPINGS', 'VARIENT_MAPPINGS'),
+    ], ids=["varient", "param"])
+    def test_generate_mappings_file_variable_name(
+        self, updater, tmp_path, file_name, mappings, expected_var, forbidden_var
+    ):
+        """测试生成映射文件时根据文件名使用正确的变量名"""
+        output_file = tmp_path / file_name
 
         updater.generate_mappings_file(mappings, output_file)
 
-        # 读取文件内容
         content = output_file.read_text(encoding='utf-8')
+        assert expected_var in content
+        assert forbidden_var not in content
 
-        # 应该使用 VARIENT_MAPPINGS 变量名
-        assert 'VARIENT_MAPPINGS' in content
-        assert 'PARAM_MAPPINGS' not in content
+    def test_generate_mappings_file_failure_keeps_previous_output(self, updater, tmp_path):
+        """测试写入中途失败时保留原映射文件且不残留临时文件"""
+        class Unrepresentable:
+            def __repr__(self):
+                raise RuntimeError("boom")
 
-    def test_generate_mappings_file_param_variable_name(self, updater, tmp_path):
-        """测试生成参数映射文件时使用正确的变量名"""
-        mappings = {'Music': {'音乐1': 'music1'}}
         output_file = tmp_path / "param_mappings.py"
+        assert updater.generate_mappings_file({'Music': {'音乐1': 'music1'}}, output_file) is True
+        previous = output_file.read_text(encoding='utf-8')
 
-        updater.generate_mappings_file(mappings, output_file)
+        assert updater.generate_mappings_file({'Music': {'音乐1': Unrepresentable()}}, output_file) is False
+        assert output_file.read_text(encoding='utf-8') == previous
+        assert not output_file.with_suffix(".py.tmp").exists()
 
-        # 读取文件内容
-        content = output_file.read_text(encoding='utf-8')
+    @pytest.mark.parametrize("content", [b"", b"xlsx bytes" * 1000], ids=["empty", "non_empty"])
+    def test_file_digest_matches_streamed_hash(self, tmp_path, content):
+        """测试 mmap 哈希与逐块读取的结果一致（包括无法 mmap 的空文件）"""
+        target = tmp_path / "data.xlsx"
+        target.write_bytes(content)
+
+        expected = hashlib.blake2b(digest_size=16)
+        expected.update(f"v{update_param._VARIENT_DIGEST_VERSION}".encode())
+        expected.update(content)
 
-        # 应该使用 PARAM_MAPPINGS 变量名
-        assert 'PARAM_MAPPINGS' in content
-        assert 'VARIENT_MAPPINGS' not in content
+        assert update_param._file_digest(target) == expected.hexdigest()
@@ -0,0 +1,31 @@
+"""
+测试资源验证脚本的缓存辅助函数
+"""
+import os
+from types import SimpleNamespace
+
+import validate_resources
+
+
+class TestLibraryDigest:
+    """测试 _library_digest 的失效条件"""
+
+    def test_changes_when_nested_folder_changes(self, tmp_path):
+        """测试只在子文件夹中增加文件时摘要也会变化"""
+        nested = tmp_path / "source" / "audio" / "music" / "sub"
+        nested.mkdir(parents=True)
+        config = SimpleNamespace(
+            resources=SimpleNamespace(project_root=tmp_path / "project", source_root=tmp_path / "source"),
+            paths=SimpleNamespace(param_config_dir=tmp_path / "param_config"),
+        )
+        config_path = tmp_path / "config.yaml"
+        folders = {"Music": "audio/music"}
+
+        before = validate_resources._library_digest(config_path, config, folders)
+        assert validate_resources._library_digest(config_path, config, folders) == before
+
+        (nested / "bgm03.ogg").touch()
+        stat = nested.stat()
+        os.utime(nested, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert validate_resources._library_digest(config_path, config, folders) != before
@@ -2,9 +2,15 @@
 参数映射更新工具
 从 Excel 参数文件生成 Python 参数映射模块
 """
+import argparse
+import hashlib
+import mmap
+import os
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from openpyxl import load_workbook
 from openpyxl.styles import Alignment
 from openpyxl.utils import get_column_letter
@@ -20,27 +26,185 @@ from core.excel_management import (
     ExcelWriteError,
     ExcelFileManager,
     DataFrameProcessor,
-    ExcelEditor
+    ExcelEditor,
+    read_file_state,
+    write_file_state,
+    load_sheets_cached,
 )
 
 logger = get_logger()
 
+# 差分映射源文件哈希版本，生成逻辑变化时递增，使旧的 varient_mappings.hash 记录失效
+_VARIENT_DIGEST_VERSION = 2
+
+
+def _file_digest(file_path: Path) -> str:
+    """
+    计算文件内容哈希
+
+    通过 mmap 把整个文件一次交给 blake2b，省去逐块读取的 Python 循环。
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{_VARIENT_DIGEST_VERSION}".encode())
+    with open(file_path, "rb") as f:
+        # 空文件无法 mmap
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+    return digest.hexdigest()
+
+
+def _is_output_current(source_file: Path, output_file: Path, digest_file: Path, digest: str) -> bool:
+    """
+    判断生成文件是否仍与源文件对应
+
+    输出文件不早于源文件，且记录的源文件哈希与当前一致时视为最新。
+
+    Args:
+        source_file: 源 Excel 文件
+        output_file: 生成的映射文件
+        digest_file: 记录源文件哈希的旁路文件
+        digest: 源文件当前的哈希
+
+    Returns:
+        bool: 是否可以跳过重新生成
+    """
+    if not output_file.exists() or not digest_file.exists():
+        return False
+    if output_file.stat().st_mtime < source_file.stat().st_mtime:
+        return False
+    try:
+        return digest_file.read_text(encoding="utf-8").strip() == digest
+    except OSError:
+        return False
+
+
+def _param_sheet_fingerprint(excel_file: Path, data_digest: str) -> Dict:
+    """
+    演出表格参数表的指纹
+
+    由写入的参数数据哈希和文件的修改时间、大小组成；用户编辑过文件后
+    修改时间会变化，文件会被重新处理。
+
+    Args:
+        excel_file: 演出表格路径
+        data_digest: 参数数据的哈希
+
+    Returns:
+        Dict: 可直接写入 JSON 的指纹
+    """
+    stat = excel_file.stat()
+    return {"digest": data_digest, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _update_param_sheet_file(excel_file: Path, parameter_data: Dict[str, List[str]]) -> bool:
+    """
+    更新单个演出表格的参数表
+
+    定义在模块级别，以便多进程并行时可以被 pickle。
+
+    Args:
+        excel_file: 演出表格路径
+        parameter_data: 参数数据 {参数类型: [参数值列表]}
+
+    Returns:
+        bool: 是否更新成功
+    """
+    try:
+        logger.info(f"处理文件: {excel_file.name}")
+
+        # 使用增强的 ExcelEditor 方法更新参数表
+        try:
+            success = ExcelEditor().update_parameter_sheet(
+                excel_file,
+                "参数表",
+                parameter_data,
+                create_named_ranges=True
+            )
+
+            if success:
+                logger.info(f"  成功更新参数表: {excel_file.name}")
+                return True
+            logger.error(f"  更新参数表失败: {excel_file.name}")
+
+        except ExcelWriteError as e:
+            logger.error(f"  写入Excel失败: {excel_file} - {e}")
+        except PermissionError as e:
+            logger.error(f"  文件被占用或无写入权限: {excel_file} - {e}")
+        except Exception as e:
+            logger.error(f"  处理文件时发生错误: {excel_file} - {e}")
+
+    except Exception as e:
+        logger.error(f"  处理文件 {excel_file.name} 时发生错误: {e}", exc_info=True)
+
+    return False
+
 
 class ParamUpdater:
     """参数映射更新器"""
 
-    def __init__(self, config: AppConfig):
+    def __init__(
+        self,
+        config: AppConfig,
+        use_disk_cache: bool = True,
+        excel_manager: Optional[ExcelFileManager] = None,
+        jobs: int = 1
+    ):
         """
         初始化参数更新器
 
         Args:
             config: 应用配置
+            use_disk_cache: 是否使用磁盘上的工作表解析缓存
+            excel_manager: 共享的 Excel 文件管理器，传入后与其他组件共用内存缓存；
+                为 None 时新建一个
+            jobs: 更新演出表格时的并行进程数，1 表示在当前进程中逐个处理
+                （子进程的日志不会进入 GUI 日志面板，GUI 中保持默认值）
         """
         self.config = config
+        self.use_disk_cache = use_disk_cache
+        self.jobs = jobs
         self.engine_type = config.engine.engine_type
-        self.excel_manager = ExcelFileManager(cache_enabled=True)
+        self.excel_manager = excel_manager or ExcelFileManager(cache_enabled=True)
+        # 本次运行中已读取的工作表：路径 -> ((修改时间, 大小), 工作表)，
+        # 同一文件在 read_param_file 和 collect_validation_data 中只需反序列化一次
+        self._loaded_sheets: Dict[Path, Tuple[Tuple[int, int], Dict[str, pd.DataFrame]]] = {}
+        # get_all_validate_params 的结果缓存，只与 engine_type 相关
+        self._validate_params_cache: Optional[Dict[str, List[str]]] = None
         self.df_processor = DataFrameProcessor(config)
 
+    def _load_sheets(self, excel_file: Path) -> Dict[str, pd.DataFrame]:
+        """
+        读取 Excel 文件的所有工作表，命中磁盘缓存时跳过解析
+
+        缓存位于 <param_config_dir>/.cache/，每个文件只保留一份，内容变化时原地替换。
+
+        Args:
+            excel_file: Excel 文件路径
+
+        Returns:
+            Dict[str, pd.DataFrame]: 工作表名到 DataFrame 的映射
+        """
+        if not self.use_disk_cache or not excel_file.exists():
+            return self.excel_manager.load_excel(excel_file)
+
+        stat = excel_file.stat()
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        loaded = self._loaded_sheets.get(excel_file)
+        if loaded is not None and loaded[0] == file_key:
+            return loaded[1]
+
+        cache_dir = Path(self.config.paths.param_config_dir) / ".cache"
+        sheets = load_sheets_cached(excel_file, self.excel_manager, cache_dir)
+        self._loaded_sheets[excel_file] = (file_key, sheets)
+        return sheets
+
     def read_param_file(self, param_file: Path, skip_template: bool = True) -> Dict[str, Dict[str, str]]:
         """
         读取参数文件并生成映射
@@ -58,15 +222,18 @@ class ParamUpdater:
 
         try:
             # 使用新的ExcelFileManager读取所有工作表
-            sheets = self.excel_manager.load_excel(param_file)
+            sheets = self._load_sheets(param_file)
             logger.info(f"读取到 {len(sheets)} 个工作表")
 
             mappings = {}
+            # 有效映射统计（非空且非模板的工作表），随读取累加，避免事后再遍历一遍
+            valid_sheets = 0
+            valid_entries = 0
 
             for sheet_name, df in sheets.items():
                 # 根据参数决定是否跳过模板工作表
                 if skip_template and "模板" in sheet_name:
-                    logger.debug(f"跳过模板工作表: {sheet_name}")
+                    logger.debug("跳过模板工作表: %s", sheet_name)
                     continue
 
                 # 检查必需的列
@@ -74,21 +241,25 @@ class ParamUpdater:
                     logger.warning(f"工作表 {sheet_name} 缺少必需的列，跳过")
                     continue
 
-                # 构建映射
-                sheet_mapping = {}
-                for _, row in df.iterrows():
-                    excel_param = row["ExcelParam"]
-                    scenario_param = row["ScenarioParam"]
-
-                    if pd.notna(excel_param) and pd.notna(scenario_param):
-                        sheet_mapping[str(excel_param)] = str(scenario_param)
+                # 构建映射（load_excel 已按字符串读取并把空单元格填为 ""，整列配对即可）
+                sheet_mapping = dict(zip(
+                    df["ExcelParam"].tolist(),
+                    df["ScenarioParam"].tolist()
+                ))
 
                 # 对于差分参数文件，保留空映射（包括模板）
                 if not skip_template or sheet_mapping:
                     mappings[sheet_name] = sheet_mapping
                     if sheet_mapping:
                         logger.info(f"工作表 {sheet_name}: {len(sheet_mapping)} 个映射")
+                        if "模板" not in sheet_name:
+                            valid_sheets += 1
+                            valid_entries += len(sheet_mapping)
 
+            if valid_sheets:
+                logger.info(f"读取完成: {valid_sheets} 个有效工作表, {valid_entries} 个映射")
+            else:
+                logger.info(f"读取完成: {param_file.name} 中没有有效的映射")
             return mappings
 
         except ExcelFileNotFoundError as e:
@@ -101,33 +272,45 @@ class ParamUpdater:
             logger.error(f"读取参数文件失败: {e}", exc_info=True)
             return {}
 
-    def generate_mappings_file(self, mappings: Dict[str, Dict[str, str]], output_file: Path):
+    def generate_mappings_file(self, mappings: Dict[str, Dict[str, str]], output_file: Path) -> bool:
         """
         生成参数映射 Python 文件
 
         Args:
             mappings: 参数映射字典
             output_file: 输出文件路径
+
+        Returns:
+            bool: 是否写入成功
         """
+        # 先写临时文件再替换，中途中断也不会留下不完整的映射文件
+        tmp_file = output_file.with_suffix(output_file.suffix + ".tmp")
+
         try:
             # 根据文件名确定变量名
             variable_name = "VARIENT_MAPPINGS" if "varient" in output_file.name else "PARAM_MAPPINGS"
 
-            with open(output_file, "w", encoding="utf-8") as f:
+            # 逐项写出字典字面量，不在内存中拼出完整文本
+            with open(tmp_file, "w", encoding="utf-8", buffering=1 << 20) as f:
                 f.write("# 自动生成的参数映射文件\n")
                 f.write("# 请不要手动编辑此文件\n")
                 f.write(f"# 引擎类型: {self.engine_type}\n\n")
-                f.write(f"{variable_name} = ")
-
-                # 使用 repr 生成格式化的字典
-                import pprint
-                f.write(pprint.pformat(mappings, width=100, sort_dicts=False))
-                f.write("\n")
+                f.write(f"{variable_name} = {{\n")
+                for sheet_name, sheet_mapping in mappings.items():
+                    f.write(f"    {sheet_name!r}: {{\n")
+                    for key, value in sheet_mapping.items():
+                        f.write(f"        {key!r}: {value!r},\n")
+                    f.write("    },\n")
+                f.write("}\n")
+            os.replace(tmp_file, output_file)
 
             logger.info(f"参数映射已保存到: {output_file}")
+            return True
 
         except Exception as e:
             logger.error(f"保存参数映射文件失败: {e}", exc_info=True)
+            tmp_file.unlink(missing_ok=True)
+            return False
 
     def collect_validation_data(
         self, 
@@ -148,27 +331,20 @@ class ParamUpdater:
 
         # 1. 收集基础参数
         try:
-            base_sheets = self.excel_manager.load_excel(param_file)
+            base_sheets = self._load_sheets(param_file)
 
             for sheet_name, df in base_sheets.items():
                 # 检查是否有 ExcelParam 列
                 if "ExcelParam" not in df.columns:
                     continue
 
-                # 提取参数值
-                params = []
-                for _, row in df.iterrows():
-                    excel_param = row["ExcelParam"]
-                    # 使用空值检查方法
-                    if pd.notna(excel_param):
-                        param_str = str(excel_param)
-                        if param_str:
-                            params.append(param_str)
+                # 提取参数值（单元格已是字符串，空单元格为 ""）
+                params = [param for param in df["ExcelParam"].tolist() if param]
 
                 # 只保存非空的参数列表
                 if params:
                     validation_data[sheet_name] = params
-                    logger.debug(f"收集参数 {sheet_name}: {len(params)} 个值")
+                    logger.debug("收集参数 %s: %d 个值", sheet_name, len(params))
 
         except (ExcelFileNotFoundError, ExcelFormatError) as e:
             logger.error(f"读取基础参数文件失败: {param_file} - {e}")
@@ -180,33 +356,23 @@ class ParamUpdater:
         # 2. 收集差分参数
         if varient_file is not None and varient_file.exists():
             try:
-                varient_sheets = self.excel_manager.load_excel(varient_file)
+                varient_sheets = self._load_sheets(varient_file)
 
-                # 收集所有差分参数名
+                # 收集所有差分参数名（各表的 ExcelParam 列拼成一列后统一处理）
+                columns = [df["ExcelParam"] for df in varient_sheets.values() if "ExcelParam" in df.columns]
                 all_varient_params = set()
-                for sheet_name, df in varient_sheets.items():
-                    if "ExcelParam" not in df.columns:
-                        continue
-
-                    for _, row in df.iterrows():
-                        excel_param = row["ExcelParam"]
-                        if pd.notna(excel_param):
-                            param_str = str(excel_param).strip()
-                            if param_str:
-                                all_varient_params.add(param_str)
+                if columns:
+                    stripped = pd.concat(columns, ignore_index=True).str.strip()
+                    all_varient_params.update(stripped[stripped != ""])
 
                 # 将差分参数合并到 Varient 列
                 if all_varient_params:
-                    if "Varient" in validation_data:
-                        # 合并去重
-                        existing_varients = set(validation_data["Varient"])
-                        combined_varients = existing_varients.union(all_varient_params)
-                        validation_data["Varient"] = sorted(list(combined_varients))
-                    else:
-                        validation_data["Varient"] = sorted(list(all_varient_params))
-
                     logger.debug(f"收集差分参数: {len(all_varient_params)} 个值")
 
+                    # 与基础参数中的 Varient 原地合并去重
+                    all_varient_params.update(validation_data.get("Varient", ()))
+                    validation_data["Varient"] = sorted(all_varient_params)
+
             except (ExcelFileNotFoundError, ExcelFormatError) as e:
                 logger.warning(f"读取差分参数文件失败: {varient_file} - {e}")
             except Exception as e:
@@ -217,15 +383,22 @@ class ParamUpdater:
     def get_all_validate_params(self) -> Dict[str, List[str]]:
         """
         获取所有句子生成器的参数翻译类型
-        
+
+        结果只取决于 engine_type，首次成功获取后缓存在实例上，
+        避免每次都重新扫描生成器类。
+
         Returns:
             Dict[str, List[str]]: 包含translate_types和validate_types的字典
         """
+        if self._validate_params_cache is not None:
+            return self._validate_params_cache
+
         try:
             # 创建管理器实例
             manager = SentenceGeneratorManager(self.engine_type)
             # 调用我们之前写的方法
-            return manager.get_validate_params()
+            self._validate_params_cache = manager.get_validate_params()
+            return self._validate_params_cache
         except Exception as e:
             logger.error(f"获取数据验证参数类型时发生错误: {e}")
             return {}
@@ -253,7 +426,11 @@ class ParamUpdater:
         translate_params = param_types.get("translate_types", [])
         validate_params = param_types.get("validate_types", [])
 
-        all_params = sorted(validate_params + translate_params)
+        # 同一类型可能既是翻译类型又是验证类型，先去重
+        all_params = sorted(set(validate_params).union(translate_params))
+
+        # 准备参数数据（按照 all_params 的顺序），与具体文件无关，所有文件共用
+        parameter_data = {param_type: validation_data.get(param_type, []) for param_type in all_params}
 
         # 获取 input 目录
         input_dir = Path(self.config.paths.input_dir)
@@ -261,54 +438,47 @@ class ParamUpdater:
             logger.error(f"输入目录不存在: {input_dir}")
             return False
 
-        # 查找所有 Excel 文件
-        excel_files = list(input_dir.glob("*.xlsx"))
-        excel_files = [f for f in excel_files if not f.name.startswith("~")]
+        # 查找所有 Excel 文件（跳过 Excel 打开文件时生成的 ~$ 临时文件）
+        with os.scandir(input_dir) as entries:
+            excel_files = [
+                Path(entry.path) for entry in entries
+                if entry.name.endswith(".xlsx") and not entry.name.startswith("~") and entry.is_file()
+            ]
 
         if not excel_files:
             logger.warning(f"在 {input_dir} 中没有找到 Excel 文件")
             return True
 
         logger.info(f"找到 {len(excel_files)} 个演出表格文件")
-        # 创建 ExcelEditor 实例
-        excel_writer = ExcelEditor()
-        success_count = 0
 
-        for excel_file in excel_files:
-            try:
-                logger.info(f"处理文件: {excel_file.name}")
-
-                # 准备参数数据（按照 all_params 的顺序）
-                parameter_data = {}
-                for param_type in all_params:
-                    params = validation_data.get(param_type, [])
-                    parameter_data[param_type] = params
-
-                # 使用增强的 ExcelEditor 方法更新参数表
-                try:
-                    success = excel_writer.update_parameter_sheet(
-                        excel_file,
-                        "参数表",
-                        parameter_data,
-                        create_named_ranges=True
-                    )
-
-                    if success:
-                        logger.info(f"  成功更新参数表: {excel_file.name}")
-                        success_count += 1
-                    else:
-                        logger.error(f"  更新参数表失败: {excel_file.name}")
-                        
-                except ExcelWriteError as e:
-                    logger.error(f"  写入Excel失败: {excel_file} - {e}")
-                except PermissionError as e:
-                    logger.error(f"  文件被占用或无写入权限: {excel_file} - {e}")
-                except Exception as e:
-                    logger.error(f"  处理文件时发生错误: {excel_file} - {e}")
+        # 参数数据和文件本身都没变过的演出表格无需再打开
+        data_digest = hashlib.blake2b(repr(list(parameter_data.items())).encode("utf-8"), digest_size=16).hexdigest()
+        state_file = Path(self.config.paths.param_config_dir) / ".cache" / "param_sheet_state.json"
+        sheet_state = read_file_state(state_file) if self.use_disk_cache else {}
+
+        pending_files = [
+            excel_file for excel_file in excel_files
+            if sheet_state.get(str(excel_file.resolve())) != _param_sheet_fingerprint(excel_file, data_digest)
+        ]
+        skipped_count = len(excel_files) - len(pending_files)
+        if skipped_count:
+            logger.info(f"跳过 {skipped_count} 个参数表未变化的文件")
+
+        # 各文件相互独立；openpyxl 是纯 Python 实现，并行需要用多进程
+        if self.jobs > 1 and len(pending_files) > 1:
+            max_workers = min(self.jobs, len(pending_files))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_update_param_sheet_file, pending_files, repeat(parameter_data)))
+        else:
+            results = [_update_param_sheet_file(excel_file, parameter_data) for excel_file in pending_files]
 
-            except Exception as e:
-                logger.error(f"  处理文件 {excel_file.name} 时发生错误: {e}", exc_info=True)
+        if self.use_disk_cache:
+            for excel_file, success in zip(pending_files, results):
+                if success:
+                    sheet_state[str(excel_file.resolve())] = _param_sheet_fingerprint(excel_file, data_digest)
+            write_file_state(state_file, sheet_state)
 
+        success_count = sum(results) + skipped_count
         logger.info(f"处理完成，成功更新 {success_count}/{len(excel_files)} 个文件")
         return success_count > 0
 
@@ -338,9 +508,6 @@ class ParamUpdater:
             logger.info(f"生成参数映射文件: {output_file}")
             self.generate_mappings_file(mappings, output_file)
 
-            total_mappings = sum(len(m) for m in mappings.values())
-            logger.info(f"基础参数映射: {len(mappings)} 个工作表, {total_mappings} 个映射")
-            
         except Exception as e:
             logger.error(f"处理基础参数映射时失败: {e}")
             return False
@@ -350,24 +517,26 @@ class ParamUpdater:
         varient_file_path = None  # 明确设置为 None
 
         if varient_file.exists():
-            logger.info(f"读取差分参数文件: {varient_file}")
             try:
-                # 差分参数文件不跳过模板工作表，保持与原项目一致
-                varient_mappings = self.read_param_file(varient_file, skip_template=False)
-
-                # 生成差分映射文件（保持与原项目一致，包含空映射）
                 varient_output = self.config.paths.param_config_dir / "varient_mappings.py"
-                logger.info(f"生成差分参数映射文件: {varient_output}")
-                self.generate_mappings_file(varient_mappings, varient_output)
-
-                # 统计有效映射（排除模板）
-                valid_mappings = {k: v for k, v in varient_mappings.items() if v and "模板" not in k}
-                if valid_mappings:
-                    total_varient = sum(len(m) for m in valid_mappings.values())
-                    logger.info(f"差分参数映射: {len(valid_mappings)} 个角色, {total_varient} 个映射")
+                varient_digest_file = varient_output.with_suffix(".hash")
+                varient_digest = _file_digest(varient_file)
+
+                if self.use_disk_cache and _is_output_current(
+                    varient_file, varient_output, varient_digest_file, varient_digest
+                ):
+                    logger.info(f"差分参数文件未变化，跳过生成: {varient_output}")
                 else:
-                    logger.info("差分参数文件中没有有效的角色映射")
-                    
+                    logger.info(f"读取差分参数文件: {varient_file}")
+                    # 差分参数文件不跳过模板工作表，保持与原项目一致
+                    varient_mappings = self.read_param_file(varient_file, skip_template=False)
+
+                    # 生成差分映射文件（保持与原项目一致，包含空映射）
+                    logger.info(f"生成差分参数映射文件: {varient_output}")
+                    # 有效映射统计已由 read_param_file 在读取时输出
+                    if self.generate_mappings_file(varient_mappings, varient_output):
+                        varient_digest_file.write_text(varient_digest, encoding="utf-8")
+
                 # 将文件路径赋值给变量
                 varient_file_path = varient_file
                     
@@ -404,6 +573,20 @@ class ParamUpdater:
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="从 Excel 参数文件生成参数映射模块")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="忽略 param_config/.cache 中的解析缓存，重新读取所有 Excel 文件"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="并行更新演出表格的进程数（默认 1，即逐个处理）"
+    )
+    args = parser.parse_args()
+
     try:
         # 加载配置
         config_path = Path("config.yaml")
@@ -414,7 +597,7 @@ def main():
         config = AppConfig.from_file(config_path)
 
         # 创建更新器
-        updater = ParamUpdater(config)
+        updater = ParamUpdater(config, use_disk_cache=not args.no_cache, jobs=args.jobs)
 
         # 执行更新
         success = updater.update_mappings()
@@ -2,11 +2,18 @@
 资源完整性验证工具
 检查 Excel 中引用的资源文件是否存在
 """
-import pandas as pd
+import argparse
+import hashlib
 import json
+import logging
+import multiprocessing
+import os
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 from core.config_manager import AppConfig
 from core.param_translator import ParamTranslator
 from core.resource_extractor import ResourceExtractor
@@ -17,10 +24,40 @@ from core.excel_management import (
     ExcelFileNotFoundError,
     ExcelFormatError,
     ExcelFileManager,
+    read_file_state,
+    write_file_state,
+    load_sheets_cached,
 )
 
 logger = get_logger()
 
+# JSON 报告编码：安装了 orjson 时使用（Rust 实现，直接输出 UTF-8 字节），否则使用标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 验证记录文件名（保存在报告目录中）
+VALIDATION_STATE_FILE = ".validation_state.json"
+
+
+@dataclass
+class ValidationContext:
+    """验证单个 Excel 文件所需的对象，按配置创建一次后供所有文件共用"""
+    excel_manager: ExcelFileManager
+    extractor: ResourceExtractor
+    validator: ResourceValidator
+    resource_folders: Dict[str, str]
+    report_dir: Path
+    sheet_cache_dir: Optional[Path] = None
+
+    def validate(self, excel_file: Path) -> Optional[str]:
+        """验证单个 Excel 文件，返回报告文本（跳过时返回 None）"""
+        return validate_excel_file(
+            excel_file, self.excel_manager, self.extractor, self.validator,
+            self.resource_folders, self.report_dir, self.sheet_cache_dir
+        )
+
 
 def get_resource_folders(extractor: ResourceExtractor) -> Dict[str, str]:
     """
@@ -29,17 +66,27 @@ def get_resource_folders(extractor: ResourceExtractor) -> Dict[str, str]:
     Returns:
         Dict[str, str]: {资源类型: 文件夹路径}
     """
-    folders = {}
+    # 复用提取器在 setup 时展平的资源配置，不再逐个生成器扫描属性
+    return {
+        config["resource_type"]: config["folder"]
+        for config in extractor.resource_configs
+        if config.get("folder")
+    }
 
-    for generator in extractor.generators:
-        configs = extractor.get_resource_configs(generator)
-        for config in configs:
-            resource_type = config["resource_type"]
-            folder = config.get("folder", "")
-            if folder:
-                folders[resource_type] = folder
 
-    return folders
+def _format_name_list(names) -> str:
+    """
+    把资源名列表格式化为报告中的缩进列表（按名称排序，只有一个名字时不排序）
+
+    Args:
+        names: 资源名列表
+
+    Returns:
+        str: 多行文本
+    """
+    if len(names) > 1:
+        names = sorted(names)
+    return "\n".join(f"      - {name}" for name in names)
 
 
 def generate_report(
@@ -81,23 +128,24 @@ def generate_report(
             total_project_found += project_found
             total_source_found += source_found
 
-            lines.append(f"  {resource_type}:")
-            lines.append(f"    总计: {len(resource_names)}")
-            lines.append(f"    项目库: 找到 {project_found} / 缺失 {project_missing}")
-            lines.append(f"    资源库: 找到 {source_found} / 缺失 {source_missing}")
+            # 每个资源类型的统计整块格式化
+            lines.append(
+                f"  {resource_type}:\n"
+                f"    总计: {len(resource_names)}\n"
+                f"    项目库: 找到 {project_found} / 缺失 {project_missing}\n"
+                f"    资源库: 找到 {source_found} / 缺失 {source_missing}"
+            )
 
-            # 显示缺失文件
+            # 显示缺失文件（每个列表排序一次，整段拼接）
             missing_in_both = comp_data.get("missing_in_both", [])
             if missing_in_both:
                 lines.append(f"    两个库都缺失 ({len(missing_in_both)}):")
-                for name in sorted(missing_in_both):
-                    lines.append(f"      - {name}")
+                lines.append(_format_name_list(missing_in_both))
 
             missing_in_project = comp_data.get("missing_in_project_but_in_source", [])
             if missing_in_project:
                 lines.append(f"    项目库缺失但资源库存在 ({len(missing_in_project)}):")
-                for name in sorted(missing_in_project):
-                    lines.append(f"      - {name}")
+                lines.append(_format_name_list(missing_in_project))
 
         lines.append("")
 
@@ -116,8 +164,323 @@ def generate_report(
     return "\n".join(lines)
 
 
+def _encode_json_report(json_data: Dict) -> bytes:
+    """
+    编码 JSON 报告（缩进 2 格，非 ASCII 字符原样输出，集合编码为列表）
+
+    Args:
+        json_data: 报告数据
+
+    Returns:
+        bytes: UTF-8 编码的 JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(json_data, default=list, option=orjson.OPT_INDENT_2)
+    return json.dumps(json_data, default=list, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _replace_file(target_file: Path, data: bytes):
+    """
+    一次写入临时文件后原子替换目标文件，中断时不会留下写了一半的报告
+
+    Args:
+        target_file: 目标文件路径
+        data: 文件内容
+    """
+    tmp_file = target_file.with_name(target_file.name + ".tmp")
+    try:
+        tmp_file.write_bytes(data)
+        os.replace(tmp_file, target_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+
+def _report_files(report_dir: Path, excel_file: Path) -> Tuple[Path, Path]:
+    """
+    Excel 文件对应的报告路径
+
+    Args:
+        report_dir: 报告输出目录
+        excel_file: Excel 文件路径
+
+    Returns:
+        Tuple[Path, Path]: (文本报告路径, JSON 报告路径)
+    """
+    stem = excel_file.stem
+    return report_dir / f"{stem}_validation.txt", report_dir / f"{stem}_validation.json"
+
+
+def validate_excel_file(
+    excel_file: Path,
+    excel_manager: ExcelFileManager,
+    extractor: ResourceExtractor,
+    validator: ResourceValidator,
+    resource_folders: Dict[str, str],
+    report_dir: Path,
+    sheet_cache_dir: Optional[Path] = None
+) -> Optional[str]:
+    """
+    验证单个 Excel 文件引用的资源，并保存文本和 JSON 报告
+
+    Args:
+        excel_file: Excel 文件路径
+        excel_manager: Excel 文件管理器
+        extractor: 资源提取器
+        validator: 资源验证器
+        resource_folders: 资源文件夹映射 {资源类型: 文件夹路径}
+        report_dir: 报告输出目录（需已存在）
+        sheet_cache_dir: 解析缓存目录（可选）
+
+    Returns:
+        Optional[str]: 报告文本；文件被跳过时返回 None
+    """
+    logger.info("\n处理文件: %s", excel_file.name)
+
+    try:
+        # 读取 Excel
+        excel_data = load_sheets_cached(excel_file, excel_manager, sheet_cache_dir)
+
+    except ExcelFileNotFoundError as e:
+        logger.error(f"文件不存在，跳过: {excel_file}")
+        return None
+    except ExcelFormatError as e:
+        logger.error(f"Excel格式错误，跳过: {excel_file} - {e}")
+        return None
+    except Exception as e:
+        logger.error(f"读取Excel失败，跳过: {excel_file} - {e}")
+        return None
+
+    # 提取资源
+    try:
+        resources = extractor.extract_from_excel(excel_data)
+    except Exception as e:
+        logger.error(f"提取资源失败，跳过: {excel_file} - {e}")
+        return None
+
+    if not resources:
+        logger.warning("未找到任何资源引用")
+        return None
+
+    # 显示提取的资源统计（只在会输出时才统计）
+    if logger.isEnabledFor(logging.INFO):
+        total_resources = sum(len(names) for types in resources.values() for names in types.values())
+        logger.info("提取到 %d 个资源引用", total_resources)
+
+    # 验证资源
+    try:
+        validation_results = validator.validate_resources(resources, resource_folders)
+    except Exception as e:
+        logger.error(f"验证资源失败，跳过: {excel_file} - {e}")
+        return None
+
+    # 生成文本报告
+    report_text = generate_report(resources, validation_results, excel_file.name)
+
+    # 保存报告到文件（目录在创建验证上下文时已建好）
+    text_report_file, json_report_file = _report_files(report_dir, excel_file)
+
+    try:
+        # 保存文本报告（供用户查看）
+        # 与文本模式写入一致，换行使用系统默认换行符
+        _replace_file(text_report_file, report_text.replace("\n", os.linesep).encode("utf-8"))
+
+        # 保存 JSON 报告（供程序读取）
+        json_data = {
+            "timestamp": time.time(),
+            "excel_file": str(excel_file),
+            "excel_name": excel_file.name,
+            "resources": resources,  # 资源名集合在编码时转换为列表
+            "validation_results": validation_results,
+            "resource_folders": resource_folders
+        }
+
+        _replace_file(json_report_file, _encode_json_report(json_data))
+        logger.info("报告已保存: %s, %s", text_report_file, json_report_file)
+
+    except Exception as e:
+        logger.error(f"保存报告失败: {excel_file} - {e}")
+
+    return report_text
+
+
+def create_validation_context(config: AppConfig, use_disk_cache: bool = True) -> ValidationContext:
+    """
+    根据配置创建验证所需的对象（翻译器、提取器、验证器等）
+
+    Args:
+        config: 应用配置
+        use_disk_cache: 是否使用 Excel 解析的磁盘缓存
+
+    Returns:
+        ValidationContext: 验证上下文
+    """
+    # 创建翻译器
+    translator = ParamTranslator(
+        module_file=str(config.paths.param_config_dir / "param_mappings.py"),
+        varient_module_file=str(config.paths.param_config_dir / "varient_mappings.py")
+    )
+
+    # 创建生成器管理器
+    generator_manager = SentenceGeneratorManager(config.engine.engine_type)
+    generator_manager.load()
+
+    # 创建资源提取器
+    extractor = ResourceExtractor(generator_manager, translator, config.engine)
+    extractor.setup()
+
+    # 获取资源文件夹映射
+    resource_folders = get_resource_folders(extractor)
+    logger.info(f"资源文件夹映射: {resource_folders}")
+
+    # 创建资源验证器
+    validator = ResourceValidator(
+        config.resources.project_root,
+        config.resources.source_root,
+        config.resources.extensions
+    )
+
+    # 报告目录只在这里创建一次，逐个文件验证时不再重复 mkdir
+    report_dir = config.paths.output_dir / "validation_reports"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    return ValidationContext(
+        excel_manager=ExcelFileManager(cache_enabled=True),
+        extractor=extractor,
+        validator=validator,
+        resource_folders=resource_folders,
+        report_dir=report_dir,
+        sheet_cache_dir=report_dir / ".cache" if use_disk_cache else None
+    )
+
+
+# 工作进程内的验证上下文，由 _init_validate_worker 在每个工作进程中设置一次
+_worker_context: Optional[ValidationContext] = None
+
+
+def _worker_mp_context() -> Optional[multiprocessing.context.BaseContext]:
+    """
+    工作进程的启动方式
+
+    Linux 上使用 fork：进程参数（包括 initargs）随进程直接继承、不经过序列化，主进程已创建的
+    验证上下文可以写时复制地交给工作进程，省去每个进程重新加载生成器和映射；
+    macOS 上 fork 不安全、Windows 不支持，返回 None 沿用默认方式。
+    """
+    if sys.platform.startswith("linux") and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def _init_validate_worker(
+    config_path: Path,
+    use_disk_cache: bool,
+    context: Optional[ValidationContext] = None
+) -> None:
+    """
+    工作进程初始化
+
+    Args:
+        config_path: 配置文件路径
+        use_disk_cache: 是否使用 Excel 解析的磁盘缓存
+        context: fork 启动时传入主进程的验证上下文；为 None 时按配置文件重建
+    """
+    global _worker_context
+    if context is None:
+        context = create_validation_context(AppConfig.from_file(config_path), use_disk_cache)
+    _worker_context = context
+
+
+def _validate_in_worker(excel_file: Path) -> Optional[str]:
+    """在工作进程中验证单个 Excel 文件"""
+    return _worker_context.validate(excel_file)
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    """返回路径的修改时间（纳秒），不存在时返回 None"""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _folder_tree_mtimes(folder: Path) -> List[List]:
+    """
+    文件夹及其所有子文件夹的修改时间
+
+    Args:
+        folder: 文件夹路径
+
+    Returns:
+        List[List]: [[相对路径, 修改时间], ...]，文件夹不存在时修改时间为 None
+    """
+    mtimes = [[".", _mtime_ns(folder)]]
+    for dirpath, dirnames, _ in os.walk(folder):
+        dirnames.sort()
+        for dirname in dirnames:
+            subfolder = Path(dirpath) / dirname
+            mtimes.append([subfolder.relative_to(folder).as_posix(), _mtime_ns(subfolder)])
+    return mtimes
+
+
+def _library_digest(config_path: Path, config: AppConfig, resource_folders: Dict[str, str]) -> str:
+    """
+    验证环境的摘要
+
+    由配置文件、参数映射模块以及项目库和资源库中各资源文件夹（包括所有子文件夹）的
+    修改时间组成。资源名可以带子目录（如 "sub/bgm03"），而在子文件夹中增删文件只改变
+    该子文件夹自身的修改时间，所以需要逐层记录。
+
+    Args:
+        config_path: 配置文件路径
+        config: 应用配置
+        resource_folders: 资源文件夹映射 {资源类型: 文件夹路径}
+
+    Returns:
+        str: 摘要字符串
+    """
+    folders = sorted(set(resource_folders.values()))
+    roots = (Path(config.resources.project_root), Path(config.resources.source_root))
+    state = {
+        "config": _mtime_ns(config_path),
+        "mappings": [
+            _mtime_ns(config.paths.param_config_dir / name)
+            for name in ("param_mappings.py", "varient_mappings.py")
+        ],
+        "folders": [[str(root / folder), _folder_tree_mtimes(root / folder)] for root in roots for folder in folders],
+    }
+    return hashlib.blake2b(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _validation_fingerprint(excel_file: Path, library_digest: str) -> Dict:
+    """
+    Excel 文件验证结果的指纹
+
+    Args:
+        excel_file: Excel 文件路径
+        library_digest: 验证环境的摘要
+
+    Returns:
+        Dict: 可直接写入 JSON 的指纹
+    """
+    stat = excel_file.stat()
+    return {"library": library_digest, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="检查 Excel 中引用的资源文件是否存在")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="忽略上次的验证记录和 Excel 解析缓存，重新读取并验证所有 Excel 文件"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="并行验证 Excel 文件的进程数（默认 1，即逐个处理）"
+    )
+    args = parser.parse_args()
+
     try:
         # 加载配置
         config_path = Path("config.yaml")
@@ -131,40 +494,17 @@ def main():
         logger.info("资源完整性验证工具")
         logger.info("=" * 60)
 
-        # 创建翻译器
-        translator = ParamTranslator(
-            module_file=str(config.paths.param_config_dir / "param_mappings.py"),
-            varient_module_file=str(config.paths.param_config_dir / "varient_mappings.py")
-        )
-
-        # 创建生成器管理器
-        generator_manager = SentenceGeneratorManager(config.engine.engine_type)
-        generator_manager.load()
-
-        # 创建资源提取器
-        extractor = ResourceExtractor(generator_manager, translator, config.engine)
-        extractor.setup()
-
-        # 获取资源文件夹映射
-        resource_folders = get_resource_folders(extractor)
-        logger.info(f"资源文件夹映射: {resource_folders}")
-
-        # 创建资源验证器
-        validator = ResourceValidator(
-            config.resources.project_root,
-            config.resources.source_root,
-            config.resources.extensions
-        )
-
         # 获取所有 Excel 文件
         if not config.paths.input_dir.exists():
             logger.error(f"输入目录不存在: {config.paths.input_dir}")
             return
 
-        excel_files = [
-            f for f in config.paths.input_dir.iterdir()
-            if f.suffix in ['.xlsx', '.xls'] and not f.name.startswith('~')
-        ]
+        # 一次 scandir 完成过滤，只为符合条件的条目构造 Path
+        with os.scandir(config.paths.input_dir) as entries:
+            excel_files = [
+                Path(entry.path) for entry in entries
+                if entry.name.endswith(('.xlsx', '.xls')) and not entry.name.startswith('~') and entry.is_file()
+            ]
 
         if not excel_files:
             logger.warning(f"在 {config.paths.input_dir} 中没有找到 Excel 文件")
@@ -172,87 +512,68 @@ def main():
 
         logger.info(f"找到 {len(excel_files)} 个 Excel 文件")
 
-        # 创建Excel文件管理器
-        excel_manager = ExcelFileManager(cache_enabled=True)
+        context = create_validation_context(config, use_disk_cache=not args.no_cache)
+
+        # 文件和验证环境都没有变化、且报告仍在时，直接复用上次的报告
+        state_file = context.report_dir / VALIDATION_STATE_FILE
+        validation_state = {} if args.no_cache else read_file_state(state_file)
+        library_digest = _library_digest(config_path, config, context.resource_folders)
 
-        # 处理每个文件
+        # 文件 -> (验证记录中的键, 指纹)，每个文件只 resolve/stat 一次
+        fingerprints = {}
+        cached_reports = {}
+        pending_files = []
         for excel_file in excel_files:
-            logger.info(f"\n处理文件: {excel_file.name}")
-            
-            try:
-                # 读取 Excel
-                excel_data = excel_manager.load_excel(excel_file)
-                
-            except ExcelFileNotFoundError as e:
-                logger.error(f"文件不存在，跳过: {excel_file}")
-                continue
-            except ExcelFormatError as e:
-                logger.error(f"Excel格式错误，跳过: {excel_file} - {e}")
-                continue
-            except Exception as e:
-                logger.error(f"读取Excel失败，跳过: {excel_file} - {e}")
-                continue
-
-            # 提取资源
-            try:
-                resources = extractor.extract_from_excel(excel_data)
-            except Exception as e:
-                logger.error(f"提取资源失败，跳过: {excel_file} - {e}")
-                continue
-
-            if not resources:
-                logger.warning("未找到任何资源引用")
-                continue
-
-            # 显示提取的资源统计
-            total_resources = sum(len(names) for types in resources.values() for names in types.values())
-            logger.info(f"提取到 {total_resources} 个资源引用")
-
-            # 验证资源
-            try:
-                validation_results = validator.validate_resources(resources, resource_folders)
-            except Exception as e:
-                logger.error(f"验证资源失败，跳过: {excel_file} - {e}")
-                continue
-
-            # 生成文本报告
-            report_text = generate_report(resources, validation_results, excel_file.name)
-            print(report_text)
-
-            # 保存报告到文件
-            report_dir = config.paths.output_dir / "validation_reports"
-            report_dir.mkdir(parents=True, exist_ok=True)
-
-            try:
-                # 保存文本报告（供用户查看）
-                text_report_file = report_dir / f"{excel_file.stem}_validation.txt"
-                with open(text_report_file, "w", encoding="utf-8") as f:
-                    f.write(report_text)
-                logger.info(f"文本报告已保存: {text_report_file}")
-                
-                # 保存 JSON 报告（供程序读取）
-                json_report_file = report_dir / f"{excel_file.stem}_validation.json"
-                json_data = {
-                    "timestamp": time.time(),
-                    "excel_file": str(excel_file),
-                    "excel_name": excel_file.name,
-                    "resources": {
-                        category: {
-                            rtype: list(names)  # 转换 Set 为 List
-                            for rtype, names in types.items()
-                        }
-                        for category, types in resources.items()
-                    },
-                    "validation_results": validation_results,
-                    "resource_folders": resource_folders
-                }
-
-                with open(json_report_file, "w", encoding="utf-8") as f:
-                    json.dump(json_data, f, indent=2, ensure_ascii=False)
-                logger.info(f"JSON 报告已保存: {json_report_file}")
-                
-            except Exception as e:
-                logger.error(f"保存报告失败: {excel_file} - {e}")
+            state_key = str(excel_file.resolve())
+            fingerprint = _validation_fingerprint(excel_file, library_digest)
+            fingerprints[excel_file] = (state_key, fingerprint)
+            text_report_file, json_report_file = _report_files(context.report_dir, excel_file)
+            if (
+                validation_state.get(state_key) == fingerprint
+                and text_report_file.exists()
+                and json_report_file.exists()
+            ):
+                cached_reports[excel_file] = text_report_file.read_text(encoding="utf-8")
+            else:
+                pending_files.append(excel_file)
+
+        if cached_reports:
+            logger.info(f"{len(cached_reports)} 个文件未变化，复用上次的验证报告")
+
+        # 各文件相互独立：解析 Excel 和提取资源是 CPU 密集的 Python 代码，
+        # 指定 --jobs 时用进程池绕开 GIL，每个进程只创建（或继承）一次验证上下文；报告按文件顺序输出
+        max_workers = min(args.jobs, len(pending_files))
+        executor = None
+        if max_workers > 1:
+            mp_context = _worker_mp_context()
+            # fork 时直接交出已创建的上下文；其他启动方式需要序列化参数，只传配置路径由工作进程重建
+            inherit = mp_context is not None and mp_context.get_start_method() == "fork"
+            worker_context = context if inherit else None
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=mp_context,
+                initializer=_init_validate_worker,
+                initargs=(config_path, not args.no_cache, worker_context)
+            )
+            reports = executor.map(_validate_in_worker, pending_files)
+        else:
+            reports = map(context.validate, pending_files)
+
+        try:
+            for excel_file in excel_files:
+                report_text = cached_reports.get(excel_file)
+                if report_text is None:
+                    report_text = next(reports)
+                    if report_text:
+                        state_key, fingerprint = fingerprints[excel_file]
+                        validation_state[state_key] = fingerprint
+                if report_text:
+                    print(report_text)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        write_file_state(state_file, validation_state)
 
         logger.info("所有文件验证完成")
 